@@ -0,0 +1,47 @@
+from array import array
+from rubik import MOVES
+
+'''
+Node store of the search engines
+
+A node is an index into parallel arrays instead of an object:
+    state[i]    encoded state (coord.py)
+    parent[i]   index of the parent node, -1 for the root
+    move[i]     index into MOVES of the move from the parent, -1 for the root
+    g[i]        number of moves from the root
+The route of a node is only rebuilt (by following the parents) when it is needed, for the goal.
+About 10 bytes per node.
+'''
+class NodeArena:
+    def __init__(self):
+        self.state = array('I')
+        self.parent = array('i')
+        self.move = array('b')
+        self.g = array('B')
+
+    def add(self, state, parent, move, g):
+        self.state.append(state)
+        self.parent.append(parent)
+        self.move.append(move)
+        self.g.append(g)
+        return len(self.state) - 1
+
+    def route(self, index):
+        route = []
+        while self.parent[index] != -1:
+            route.append(MOVES[self.move[index]])
+            index = self.parent[index]
+        return ''.join(reversed(route))
+
+    def __len__(self):
+        return len(self.state)
+
+# Route packed as 4 bits per move (index into MOVES), 2 moves per byte, the first move in the low nibble
+def packRoute(route: str):
+    packed = bytearray((len(route) + 1) // 2)
+    for i, c in enumerate(route):
+        packed[i >> 1] |= MOVES.index(c) << ((i & 1) << 2)
+    return bytes(packed)
+
+def unpackRoute(packed, length):
+    return ''.join([MOVES[packed[i >> 1] >> ((i & 1) << 2) & 15] for i in range(length)])
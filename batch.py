@@ -0,0 +1,48 @@
+from multiprocessing import Pool
+from os import cpu_count
+from rubik import Rubik, preload
+import solver
+
+'''
+Solve many cubes at once over a pool of worker processes
+
+A state can be a move string (scramble from the goal), a Rubik object or a (cube, orie) pair.
+Every result is (goal, node created, node visited) like A_star, or None if it was not solved.
+'''
+
+# Load everything a search needs once per worker process, not once per cube
+def _initWorker(search):
+    preload()
+    if search is solver.godSolve:
+        solver.getGodTable()
+
+def _toRubik(state):
+    if isinstance(state, str):
+        init = Rubik()
+        init.moves(state)
+        return init
+    if isinstance(state, Rubik):
+        return state
+    return Rubik(state[0], state[1])
+
+def _solveOne(job):
+    index, state, mode, transform, search = job
+    return index, search(_toRubik(state), mode, transform)
+
+# Yield the result of every state in input order, or (index, result) as soon as each one is solved if ordered is False
+# states can be any iterable, but with a pool it is read to the end at once (Pool.imap queues every job
+# from a background thread), so all the states are kept in memory: pass a very long input in slices
+def solve_many(states, mode = 0, workers = None, transform = True, search = solver.A_star, ordered = True, chunksize = 8):
+    # Rubik objects are sent as (cube, orie), they are smaller to pickle
+    jobs = ((i, (s.cube, s.orie) if isinstance(s, Rubik) else s, mode, transform, search) for i, s in enumerate(states))
+    if workers == 1:
+        for job in jobs:
+            index, result = _solveOne(job)
+            yield result if ordered else (index, result)
+        return
+    with Pool(workers or cpu_count(), initializer=_initWorker, initargs=(search,)) as pool:
+        if ordered:
+            for _, result in pool.imap(_solveOne, jobs, chunksize):
+                yield result
+        else:
+            yield from pool.imap_unordered(_solveOne, jobs, chunksize)
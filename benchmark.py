@@ -0,0 +1,208 @@
+import json
+import random
+import resource
+import sys
+from argparse import ArgumentParser
+from multiprocessing import get_context
+from os import path
+from time import perf_counter, time
+
+'''
+Reproducible benchmark of the search engines
+
+Corpus: fixed scrambles bucketed by optimal depth (quarter turns, 0 .. 14), saved as JSON and versioned
+with the repository, so every run solves exactly the same states. A corpus is made from a seed: for each
+depth, states are drawn from the breadth-first layers of the reduced cube (vectorized.layers) and the
+scramble is the inverse of their optimal route (god's table), with each move replaced at random by a move
+that does the same up to a turn of the whole cube (U or d, R or l, ...). The scrambles have all 12 moves
+and leave the DLB cubie anywhere, like real ones. (Version 1 only had "UuFfRr", DLB always at home.)
+
+Every configuration (engine x heuristic x transform, the ones solver.py __main__ runs) solves the whole
+corpus in its own fresh process, after one solve that is not timed. Each solve has a deadline; after a
+timeout the deeper buckets of that configuration are skipped. The report (JSON) has for every configuration and every depth: solved, timeouts,
+p50/p95/p99 latency, nodes created per second and the peak RSS of the process.
+
+    python benchmark.py --output result.json                    run and save
+    python benchmark.py --baseline result.json                  run and diff against a saved run
+    python benchmark.py --make-corpus --seed 1 --per-depth 5    make a new corpus
+'''
+CORPUS_VERSION = 2
+CORPUS_PATH = path.join(path.dirname(path.abspath(__file__)), 'benchmarks', 'corpus-v%d.json' % CORPUS_VERSION)
+
+# name: (engine name in solver.py, mode, transform, queue name)
+CONFIGS = {
+    'A_star/h1/transform': ('A_star', 0, True, 'OpenList'),
+    'A_star/h1': ('A_star', 0, False, 'OpenList'),
+    'A_star/h2/transform': ('A_star', 1, True, 'OpenList'),
+    'A_star/h2': ('A_star', 1, False, 'OpenList'),
+    'A_star/h3/transform': ('A_star', 2, True, 'OpenList'),
+    'A_star/h3': ('A_star', 2, False, 'OpenList'),
+    'A_star/h4/transform': ('A_star', 3, True, 'OpenList'),
+    'A_star/h4': ('A_star', 3, False, 'OpenList'),
+    'BFS/transform': ('A_star', 0, True, 'FifoList'),
+    'IDA_star/h1/transform': ('IDA_star', 0, True, None),
+    'MA_star/h1/transform': ('MA_star', 0, True, 'OpenList'),
+    'biBFS/transform': ('biBFS', 0, True, None),
+    'layerBFS/transform': ('layerBFS', 0, True, None),
+}
+
+# State up to a turn of the whole cube
+def standardState(state):
+    state = state.copy()
+    state.transformToStandard()
+    return tuple(state.cube + state.orie)
+
+def makeCorpus(seed = 1, perDepth = 5):
+    from vectorized import layers
+    from godtable import GodTable
+    from rubik import Rubik, MOVES
+    rng = random.Random(seed)
+    table = GodTable()
+    cases = []
+    for depth, layer in layers(0, "UuFfRr", reduced=True):
+        for index in sorted(rng.sample(range(len(layer)), min(perDepth, len(layer)))):
+            route, _ = table.route(int(layer[index]))
+            # Each move, or a move that gives the same state up to a turn of the whole cube, at random
+            state, target = Rubik(), Rubik()
+            for move in route[::-1].swapcase():
+                target.moves(move)
+                same = []
+                for m in MOVES:
+                    child = state.copy()
+                    child.moves(m)
+                    if standardState(child) == standardState(target):
+                        same.append(child)
+                state = rng.choice(same)
+            cases.append({'depth': depth, 'scramble': state.route})
+    return {'version': CORPUS_VERSION, 'seed': seed, 'per_depth': perDepth, 'cases': cases}
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def summary(times, generated, timeouts):
+    return {
+        'solved': len(times),
+        'timeouts': timeouts,
+        'p50': percentile(times, 0.50),
+        'p95': percentile(times, 0.95),
+        'p99': percentile(times, 0.99),
+        'nodes_per_sec': sum(generated) / sum(times) if sum(times) > 0 else None,
+    }
+
+# Runs in a fresh process, so the peak RSS is the one of this configuration only
+def runConfig(name, cases, timeout):
+    from rubik import Rubik, preload
+    from budget import BudgetExceeded
+    import solver
+    engine, mode, transform, queueName = CONFIGS[name]
+    search, queue = getattr(solver, engine), getattr(solver, queueName) if queueName else None
+    preload()
+    # One solve not timed, to build the tables the engine loads on its first use
+    warmUp = Rubik()
+    warmUp.moves("R")
+    search(warmUp, mode, transform, queue)
+    depths = {}
+    skipFrom = None
+    for case in cases:
+        depth = depths.setdefault(case['depth'], {'times': [], 'generated': [], 'timeouts': 0, 'skipped': 0})
+        if skipFrom is not None and case['depth'] >= skipFrom:
+            depth['skipped'] += 1
+            continue
+        init = Rubik()
+        init.moves(case['scramble'])
+        start = perf_counter()
+        result = search(init, mode, transform, queue, deadline=time() + timeout)
+        seconds = perf_counter() - start
+        if isinstance(result, BudgetExceeded):
+            depth['timeouts'] += 1
+            skipFrom = case['depth'] + 1
+            continue
+        depth['times'].append(seconds)
+        depth['generated'].append(result[1])
+    allTimes = [t for d in depths.values() for t in d['times']]
+    allGenerated = [n for d in depths.values() for n in d['generated']]
+    report = summary(allTimes, allGenerated, sum(d['timeouts'] for d in depths.values()))
+    report['skipped'] = sum(d['skipped'] for d in depths.values())
+    report['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    report['depths'] = {str(k): dict(summary(d['times'], d['generated'], d['timeouts']), skipped=d['skipped']) for k, d in sorted(depths.items())}
+    return report
+
+def run(corpus, configs, timeout, maxDepth = None):
+    cases = [case for case in corpus['cases'] if maxDepth is None or case['depth'] <= maxDepth]
+    results = {}
+    context = get_context('spawn')
+    for name in configs:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(runConfig, (name, cases, timeout))
+        print(name, "p50 %.4fs p95 %.4fs" % (results[name]['p50'] or 0, results[name]['p95'] or 0), file=sys.stderr)
+    return {
+        'corpus_version': corpus['version'],
+        'corpus_seed': corpus['seed'],
+        'timeout': timeout,
+        'max_depth': maxDepth,
+        'python': sys.version.split()[0],
+        'configs': results,
+    }
+
+# Changes of p50/p95/p99/nodes_per_sec against a baseline, a regression is a change worse than threshold
+# Latencies under minSeconds on both sides are noise, they are not counted as regressions
+def diff(result, baseline, threshold = 0.1, minSeconds = 0.001):
+    changes = {}
+    regressions = []
+    for name, now in result['configs'].items():
+        before = baseline['configs'].get(name)
+        if before is None:
+            continue
+        change = {}
+        for key, lowerIsBetter in (('p50', True), ('p95', True), ('p99', True), ('nodes_per_sec', False)):
+            if not now.get(key) or not before.get(key):
+                continue
+            ratio = now[key] / before[key] - 1
+            change[key] = {'before': before[key], 'now': now[key], 'change': ratio}
+            if lowerIsBetter and max(now[key], before[key]) < minSeconds:
+                continue
+            if (ratio > threshold) if lowerIsBetter else (ratio < -threshold):
+                regressions.append(name + " " + key)
+        for key in ('solved', 'timeouts'):
+            if now[key] != before[key]:
+                change[key] = {'before': before[key], 'now': now[key]}
+        if now['solved'] < before['solved']:
+            regressions.append(name + " solved")
+        changes[name] = change
+    return {'threshold': threshold, 'regressions': regressions, 'configs': changes}
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Benchmark the search engines on a fixed scramble corpus")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--make-corpus', action='store_true', help="write a new corpus to --corpus and exit")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--per-depth', type=int, default=5)
+    parser.add_argument('--config', action='append', choices=list(CONFIGS), help="only these configurations (default: all)")
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=30, help="seconds per solve")
+    parser.add_argument('--output', default=None, help="save the result JSON")
+    parser.add_argument('--baseline', default=None, help="result JSON to diff against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative change counted as a regression")
+    parser.add_argument('--min-seconds', type=float, default=0.001, help="latencies below are not compared")
+    args = parser.parse_args()
+
+    if args.make_corpus:
+        with open(args.corpus, 'w') as f:
+            json.dump(makeCorpus(args.seed, args.per_depth), f, indent=1)
+        sys.exit(0)
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    result = run(corpus, args.config or list(CONFIGS), args.timeout, args.max_depth)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report = diff(result, json.load(f), args.threshold, args.min_seconds)
+        print(json.dumps(report, indent=1))
+        sys.exit(1 if report['regressions'] else 0)
+    print(json.dumps(result, indent=1))
@@ -0,0 +1,70 @@
+import os
+from time import time
+
+'''
+Search budgets
+
+A search that gets deadline, max_nodes or max_memory checks them every CHECK_EVERY nodes it creates,
+inside its own loop (no thread, no injected exception). When one is used up it stops and returns a
+BudgetExceeded instead of its usual (goal, node created, node visited).
+
+    deadline    time() value to stop at
+    max_nodes   number of nodes created
+    max_memory  resident memory of the process in bytes (tables included)
+'''
+CHECK_EVERY = 1024
+# Size of the pages counted in /proc/self/statm: 4 kB on most systems, 16 or 64 kB on some arm64 kernels
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def residentMemory():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        import resource, sys
+        # Peak, not current, where /proc is missing. Bytes on macOS, kilobytes elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class Budget:
+    def __init__(self, deadline = None, max_nodes = None, max_memory = None):
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.max_memory = max_memory
+
+    # None if nothing is set, so the searches can skip the checks
+    @classmethod
+    def of(cls, deadline = None, max_nodes = None, max_memory = None):
+        if deadline is None and max_nodes is None and max_memory is None:
+            return None
+        return cls(deadline, max_nodes, max_memory)
+
+    # The budget used up ('deadline', 'nodes' or 'memory'), None if there is some left
+    def exceeded(self, generated):
+        if self.max_nodes is not None and generated >= self.max_nodes:
+            return 'nodes'
+        if self.deadline is not None and time() >= self.deadline:
+            return 'deadline'
+        if self.max_memory is not None and residentMemory() >= self.max_memory:
+            return 'memory'
+        return None
+
+# Result of a search stopped by its budget
+# best: the state closest to the goal found (lowest heuristic), its route is from the start state
+# lowerBound: no route to the goal is shorter (what the search proved before it stopped)
+# stats: the SearchStats of the search when it stopped, if it keeps them (see stats.py)
+# Unpacks like a search result with no goal: goal, nodeCreated, nodeVisited = result
+class BudgetExceeded:
+    def __init__(self, reason, generated, visited, best = None, lowerBound = 0, stats = None):
+        self.reason = reason
+        self.generated = generated
+        self.visited = visited
+        self.best = best
+        self.lowerBound = lowerBound
+        self.stats = stats
+
+    def __iter__(self):
+        return iter((None, self.generated, self.visited))
+
+    def __repr__(self):
+        return "BudgetExceeded(%s, generated=%d, visited=%d, lowerBound=%s)" % (self.reason, self.generated, self.visited, self.lowerBound)
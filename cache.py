@@ -0,0 +1,109 @@
+import dbm
+from collections import OrderedDict
+from threading import Lock
+from rubik import Rubik
+from coord import encode
+from arena import packRoute, unpackRoute
+import solver
+
+'''
+Solution cache
+
+Bounded in-memory map from a state to a route that solves it, least recently used entries are dropped first.
+Keys are encoded states (coord.encode) * 2 + transform: routes found with transform = True only solve
+the cube up to a rotation of the whole cube. A route is stored for the state itself, and for the
+symmetry-canonical state of its class (see symmetry.py) so the 48 conjugates of a state share it:
+a state asked again is one lookup, a conjugate of a cached state is mapped back from the canonical route.
+
+Routes are stored packed (arena.packRoute). With a filename, every entry is also written to a dbm file
+and entries not in memory are looked up there, so the cache survives restarts.
+'''
+class SolutionCache:
+    def __init__(self, capacity = 100000, filename = None, symmetry = True):
+        self.capacity = capacity
+        self.symmetry = symmetry
+        self.entries = OrderedDict()    # key -> (packed route, length), least recently used first
+        self.store = dbm.open(filename, 'c') if filename is not None else None
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Route that solves the state, None if it is not in the cache
+    def get(self, cube, orie, transform = True):
+        index = encode(cube, orie)
+        with self.lock:
+            entry = self.lookup(index * 2 + bool(transform))
+        if entry is None and self.symmetry:
+            from symmetry import canonical, mapRouteBack
+            key, _, _, sym = canonical(cube, orie)
+            with self.lock:
+                entry = self.lookup(key * 2 + bool(transform))
+                if entry is not None:
+                    # Also keep it for the state itself, the next time is one lookup
+                    entry = packRoute(mapRouteBack(sym, unpackRoute(*entry))), entry[1]
+                    self.insert(index * 2 + bool(transform), entry)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return unpackRoute(*entry)
+
+    def put(self, cube, orie, route, transform = True):
+        key = encode(cube, orie)
+        entries = [(key, route)]
+        if self.symmetry:
+            from symmetry import canonical, mapRoute
+            canonicalIndex, _, _, sym = canonical(cube, orie)
+            entries.append((canonicalIndex, mapRoute(sym, route)))
+        with self.lock:
+            for key, route in entries:
+                key = key * 2 + bool(transform)
+                entry = (packRoute(route), len(route))
+                self.insert(key, entry)
+                if self.store is not None:
+                    self.store[str(key)] = bytes([entry[1]]) + entry[0]
+
+    # Entry of a key, in memory or in the store
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        elif self.store is not None and str(key) in self.store:
+            data = self.store[str(key)]
+            entry = (data[1:], data[0])
+            self.insert(key, entry)
+        return entry
+
+    def insert(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    # Same as search(initState, mode, transform) (see solver.A_star) but a cached state costs one lookup
+    # A hit returns a goal with the route and 0 node created / visited
+    def solve(self, initState: Rubik, mode = 0, transform = True, search = solver.A_star):
+        cube, orie = list(initState.cube), list(initState.orie)
+        route = self.get(cube, orie, transform)
+        if route is not None:
+            goal = type(initState)()
+            goal.route = route
+            return goal, 0, 0
+        result = search(initState, mode, transform)
+        if result is not None:
+            goal, _, _ = result     # No goal if the search ran out of budget
+            if goal is not None:
+                self.put(cube, orie, goal.route, transform)
+        return result
+
+    def stats(self):
+        return {'size': len(self.entries), 'capacity': self.capacity, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,187 @@
+from itertools import permutations
+from array import array
+from os import path
+from patterndb import PatternDB, DATA_DIR, SCHEME_MOVE, rankPerm, rankOrie, save
+from rubik import Rubik, GOAL_POSITION, GOAL_ORIENTATION, DLB, MOVES, MOVE_INDEX, SOURCE, TWIST
+
+'''
+Integer encoding of a rubik's state
+
+    index = permutation rank * N_ORIE + orientation rank
+
+Permutation rank: lexicographic rank of cube[] (0 .. 8! - 1)
+Orientation rank: orie[0..6] read as a base-3 number, orie[7] is implied because
+                  the sum of all orientations is always divisible by 3 (0 .. 3^7 - 1)
+
+Reduced cube: the DLB cubie is at home (this is what transformToStandard gives us)
+so only 7 cubies and the 6 moves "UuFfRr" are left (5040 * 729 states)
+
+The goal state is index 0 in both encodings.
+
+The move tables are saved next to this file (MOVE_TABLES, pattern database format, 16 bits per entry)
+and read at import; a missing one is built (about a second) and saved.
+'''
+REDUCED_MOVES = "UuFfRr"
+
+N_PERM, N_ORIE = 40320, 2187
+N_PERM7, N_ORIE7 = 5040, 729
+N_STATES = N_PERM * N_ORIE
+N_STATES7 = N_PERM7 * N_ORIE7
+
+# All orientations of n cubies with a total twist divisible by 3, in rank order
+def allOries(n):
+    ories = []
+    for i in range(3 ** (n - 1)):
+        digits = []
+        for _ in range(n - 1):
+            i, d = divmod(i, 3)
+            digits.append(d)
+        digits.reverse()
+        digits.append(-sum(digits) % 3)
+        ories.append(tuple(digits))
+    return ories
+
+# Build the transition tables of n cubies for the given moves (once, at import time)
+# permMove[m][p] / orieMove[m][o] are the ranks after applying moves[m]
+def buildTables(n, moves):
+    perms = list(permutations(range(n)))
+    ories = allOries(n)
+    permRank = {p: i for i, p in enumerate(perms)}
+    orieRank = {o: i for i, o in enumerate(ories)}
+    permMove, orieMove = [], []
+    for c in moves:
+        src, twist = SOURCE[MOVE_INDEX[c]][:n], TWIST[MOVE_INDEX[c]][:n]
+        permMove.append(array('H', [permRank[tuple([p[s] for s in src])] for p in perms]))
+        orieMove.append(array('H', [orieRank[tuple([(o[s] + t) % 3 for s, t in zip(src, twist)])] for o in ories]))
+    return perms, ories, permMove, orieMove
+
+# n cubies: (permutation move table file, orientation move table file)
+MOVE_TABLES = {
+    8: ('permMove.bin', 'orieMove.bin'),
+    7: ('permMove7.bin', 'orieMove7.bin'),
+}
+
+# Same as buildTables, the move tables are read from their files (built and saved if one is missing)
+def loadTables(n, moves):
+    perms = list(permutations(range(n)))
+    ories = allOries(n)
+    files = [path.join(DATA_DIR, filename) for filename in MOVE_TABLES[n]]
+    if not all(path.exists(filename) for filename in files):
+        _, _, permMove, orieMove = buildTables(n, moves)
+        try:
+            for filename, tables in zip(files, (permMove, orieMove)):
+                save(filename, SCHEME_MOVE, [x for table in tables for x in table], [(m,) for m in range(len(moves))], bits=16)
+        except OSError:
+            # Directory not writable (read-only install): use the tables just built
+            return perms, ories, permMove, orieMove
+    permMove, orieMove = [PatternDB(filename).arrays() for filename in files]
+    return perms, ories, permMove, orieMove
+
+PERMS, ORIES, PERM_MOVE, ORIE_MOVE = loadTables(8, MOVES)
+PERMS7, ORIES7, PERM_MOVE7, ORIE_MOVE7 = loadTables(7, REDUCED_MOVES)
+
+def encode(cube, orie):
+    return rankPerm(cube) * N_ORIE + rankOrie(orie)
+
+def decode(index):
+    p, o = divmod(index, N_ORIE)
+    return list(PERMS[p]), list(ORIES[o])
+
+# Only valid if the DLB cubie is in the right place (see isCorrectPositionCube)
+def encodeReduced(cube, orie):
+    return rankPerm(cube[:DLB]) * N_ORIE7 + rankOrie(orie[:DLB])
+
+def decodeReduced(index):
+    p, o = divmod(index, N_ORIE7)
+    return list(PERMS7[p]) + [DLB], list(ORIES7[o]) + [0]
+
+# Apply one move (index into MOVES) to an encoded state
+def applyMove(index, m):
+    p, o = divmod(index, N_ORIE)
+    return PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+
+# Apply one move (index into REDUCED_MOVES) to a reduced encoded state
+def applyReducedMove(index, m):
+    p, o = divmod(index, N_ORIE7)
+    return PERM_MOVE7[m][p] * N_ORIE7 + ORIE_MOVE7[m][o]
+
+# Same API as Rubik but the whole state is a single integer, a move is two table lookups
+# and copying a state copies one int instead of two lists
+class CoordRubik(Rubik):
+    __slots__ = ('state',)
+
+    def __init__(self, cube = GOAL_POSITION, orie = GOAL_ORIENTATION):
+        self.state = encode(cube, orie)    # Encoded state, see above
+        self.route = str()
+        self.heuristic = None
+
+    @classmethod
+    def fromRubik(cls, rubik: Rubik):
+        o = cls(rubik.cube, rubik.orie)
+        o.route = rubik.route
+        return o
+
+    # Decoded views, so the list based methods of Rubik (getHeuristic, getFaceColor, loadColor...) keep working
+    @property
+    def cube(self):
+        return list(PERMS[self.state // N_ORIE])
+    @cube.setter
+    def cube(self, cube):
+        self.state = rankPerm(cube) * N_ORIE + self.state % N_ORIE
+
+    @property
+    def orie(self):
+        return list(ORIES[self.state % N_ORIE])
+    @orie.setter
+    def orie(self, orie):
+        self.state = self.state - self.state % N_ORIE + rankOrie(orie)
+
+    def copy(self):
+        o = CoordRubik.__new__(CoordRubik)
+        o.state = self.state
+        o.route = self.route
+        o.heuristic = None
+        return o
+
+    def isGoalState(self):
+        return self.state == 0
+
+    def isCorrectPositionCube(self, index):
+        p, o = divmod(self.state, N_ORIE)
+        return PERMS[p][index] == index and ORIES[o][index] == 0
+
+    # Only valid if the DLB cubie is in the right place
+    def reducedIndex(self):
+        p, o = divmod(self.state, N_ORIE)
+        return encodeReduced(PERMS[p], ORIES[o])
+
+    def __hash__(self):
+        return hash(self.state)
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, CoordRubik):
+            return self.state == o.state
+        return self.cube == o.cube and self.orie == o.orie
+
+    def moves(self, route: str):
+        state = self.state
+        for c in route:
+            m = MOVE_INDEX.get(c)
+            if m is not None:
+                p, o = divmod(state, N_ORIE)
+                state = PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+        self.state = state
+        self.route += route
+
+    def U(self): self.state = applyMove(self.state, 0)
+    def u(self): self.state = applyMove(self.state, 1)
+    def D(self): self.state = applyMove(self.state, 2)
+    def d(self): self.state = applyMove(self.state, 3)
+    def R(self): self.state = applyMove(self.state, 4)
+    def r(self): self.state = applyMove(self.state, 5)
+    def L(self): self.state = applyMove(self.state, 6)
+    def l(self): self.state = applyMove(self.state, 7)
+    def F(self): self.state = applyMove(self.state, 8)
+    def f(self): self.state = applyMove(self.state, 9)
+    def B(self): self.state = applyMove(self.state, 10)
+    def b(self): self.state = applyMove(self.state, 11)
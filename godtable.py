@@ -0,0 +1,61 @@
+from os import path
+from coord import N_ORIE7, PERM_MOVE7, ORIE_MOVE7, REDUCED_MOVES
+from patterndb import PatternDB, save, SCHEME_REDUCED
+
+'''
+God's algorithm table of the reduced cube (DLB cubie at home, moves "UuFfRr")
+
+Distance to the goal of every one of the 5040 * 729 reduced states, found by one
+breadth-first search backward from the goal. Every move has its inverse in
+REDUCED_MOVES, so distance from the goal == distance to the goal.
+
+On disk: pattern database with 4 bits per state (the 2x2 needs at most 14 quarter turns), ~1.8 MB
+It is built on the first use if the file is missing (about 1 s), processes building it at the same time
+each write their own temporary file and rename it into place (see patterndb.save).
+'''
+GOD_TABLE_PATH = path.join(path.dirname(path.abspath(__file__)), 'godTable.bin')
+UNKNOWN = 15
+
+# Retrograde breadth-first search from the goal (one depth layer at a time, see vectorized.py),
+# save and return the distance of every reduced state
+def createGodTable(filename = GOD_TABLE_PATH):
+    from vectorized import distances, UNKNOWN as NOT_REACHED
+    dist = distances(0, REDUCED_MOVES, reduced=True)
+    dist[dist == NOT_REACHED] = UNKNOWN
+    dist = bytearray(dist.tobytes())
+
+    if filename is not None:
+        save(filename, SCHEME_REDUCED, dist, bits=4)
+    return dist
+
+class GodTable:
+    def __init__(self, filename = GOD_TABLE_PATH):
+        if not path.exists(filename):
+            dist = createGodTable(None)
+            try:
+                save(filename, SCHEME_REDUCED, dist, bits=4)
+            except OSError:
+                # Directory not writable (read-only install): use the table from memory, 1 byte per state
+                self.db = None
+                self.distance = dist.__getitem__
+                return
+        self.db = PatternDB(filename)
+        self.distance = self.db.get
+
+    # Walk down the table from a reduced state to the goal
+    # Return the route and the number of generated states
+    def route(self, index):
+        route = ""
+        generated = 0
+        d = self.distance(index)
+        while d > 0:
+            p, o = divmod(index, N_ORIE7)
+            for m in range(len(REDUCED_MOVES)):
+                generated += 1
+                child = PERM_MOVE7[m][p] * N_ORIE7 + ORIE_MOVE7[m][o]
+                if self.distance(child) == d - 1:
+                    route += REDUCED_MOVES[m]
+                    index = child
+                    d -= 1
+                    break
+        return route, generated
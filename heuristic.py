@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from threading import Lock
+from rubik import PAIR_CUBES, DLB, SOURCE, TWIST, loadDB, loadDB2, loadDB3
+from patterndb import rankPerm, rankOrie
+
+'''
+Heuristic evaluators (estimated number of moves left)
+
+One object per heuristic, passed to the search engines instead of setting the Rubik.mode class global.
+Every table an evaluator needs is loaded in its constructor (the coord() tables on the first call, fully
+built before they are stored) and never changed afterwards, so the same evaluator can be used by any
+number of searches and threads at once.
+
+    h(cube, orie)   value of a state
+    h.raw(...)      integer numerator of the value, value = raw / scale
+    h.coord(p, o)   value of an encoded state (permutation rank, orientation rank of coord.py)
+    h.child(raw, cube, orie, m)
+                    raw of the state after MOVES[m] from the raw of the state before, only the
+                    incremental evaluators (h.incremental) have it
+
+A move only touches 4 cubies, so an incremental heuristic updates the parent's sum with the
+contributions of the moved cubies instead of summing everything again.
+'''
+class Heuristic(ABC):
+    scale = 1
+    incremental = False
+    mode = None         # Mode of the shared evaluators (HEURISTICS index), None for other evaluators
+    perms = None        # coord.PERMS and coord.ORIES, bound on the first coord() call
+    ories = None
+
+    @abstractmethod
+    def raw(self, cube, orie):
+        pass
+
+    def __call__(self, cube, orie):
+        return self.raw(cube, orie) / self.scale
+
+    def coord(self, p, o):
+        perms = self.perms
+        if perms is None:
+            from coord import PERMS, ORIES
+            self.ories = ORIES
+            self.perms = perms = PERMS
+        return self.raw(perms[p], self.ories[o]) / self.scale
+
+    # Never changed after it is built, copies of a state share it (see Rubik.estimate)
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # Pickled as its mode (the tables are mapped files): unpickled as the shared evaluator of that process
+    def __reduce__(self):
+        if self.mode is None:
+            return (type(self), ())
+        return (evaluator, (self.mode,))
+
+# Delta tables of a sum over positions of contribution(pos, cubie, orie)
+# moved[m]: (s, delta) for each position s that the move takes a cubie from, delta[cubie*3 + orie] is
+# the contribution of that cubie at its new place minus the one at s
+def movedDeltas(contribution):
+    moved = []
+    for src, twist in zip(SOURCE, TWIST):
+        moved.append([(s, tuple(contribution(p, c, (o + t) % 3) - contribution(s, c, o) for c in range(8) for o in range(3)))
+            for p, (s, t) in enumerate(zip(src, twist)) if s != p])
+    return moved
+
+def sumDeltas(moved, raw, cube, orie, m):
+    for s, delta in moved[m]:
+        raw += delta[cube[s]*3 + orie[s]]
+    return raw
+
+# H1 (mode 0): misoriented + misplaced cubies
+class Misplaced(Heuristic):
+    mode = 0
+    scale = 8
+    incremental = True
+
+    def __init__(self):
+        self.permTable = None
+        self.orieTable = None
+        self.moved = movedDeltas(lambda p, c, o: (o != 0) + (c != p))
+
+    def raw(self, cube, orie):
+        return sum([o != 0 for o in orie]) + sum([i != cube[i] for i in range(8)])
+
+    def child(self, raw, cube, orie, m):
+        return sumDeltas(self.moved, raw, cube, orie, m)
+
+    # The two counts only depend on the permutation / the orientation, one table for each
+    def coord(self, p, o):
+        if self.permTable is None:
+            from coord import PERMS, ORIES
+            self.orieTable = bytes([sum([x != 0 for x in orie]) for orie in ORIES])
+            self.permTable = bytes([sum([i != cube[i] for i in range(8)]) for cube in PERMS])
+        return (self.permTable[p] + self.orieTable[o]) / 8
+
+# H2 (mode 1): sum of the single cubie pattern database
+class CubieDB(Heuristic):
+    mode = 1
+    scale = 4
+    incremental = True
+
+    def __init__(self):
+        self.db = loadDB()      # db[cubie*24 + orie*8 + pos]
+        db = self.db
+        self.moved = movedDeltas(lambda p, c, o: db[c*24 + o*8 + p])
+
+    def raw(self, cube, orie):
+        db = self.db
+        return sum([db[cube[i]*24 + orie[i]*8 + i] for i in range(8)])
+
+    def child(self, raw, cube, orie, m):
+        return sumDeltas(self.moved, raw, cube, orie, m)
+
+# H3 (mode 2): sum of the cubie pair pattern database
+# Not incremental: the 4 cubies a move takes are in 6 to 12 of the 12 pairs, updating those
+# costs more than the full sum
+class PairDB(Heuristic):
+    mode = 2
+    scale = 6
+
+    def __init__(self):
+        self.db = loadDB2()     # db[pair*576 + (orie1*8 + pos1)*24 + orie2*8 + pos2]
+        self.pairs = [(k*576, a, b) for k, (a, b) in enumerate(PAIR_CUBES)]
+
+    def raw(self, cube, orie):
+        db = self.db
+        digit = [0] * 8 # Record orie*8 + position of each cube in current state
+        for i in range(8):
+            digit[cube[i]] = orie[i]*8 + i
+        return sum([db[base + digit[a]*24 + digit[b]] for base, a, b in self.pairs])
+
+
+# H4 (mode 3): max of the orientation only and permutation only tables
+# Both tables are exact for their abstraction, max of the two is still admissible
+# The reduced tables are used when the DLB cubie is at home, they are smaller and tighter
+class CoordDB(Heuristic):
+    mode = 3
+
+    def __init__(self):
+        self.orieDB, self.permDB, self.orieDB7, self.permDB7 = loadDB3()
+        self.perm7 = None
+        self.orie7 = None
+
+    def raw(self, cube, orie):
+        if cube[DLB] == DLB and orie[DLB] == 0:
+            return max(self.orieDB7[rankOrie(orie[:DLB])], self.permDB7[rankPerm(cube[:DLB])])
+        return max(self.orieDB[rankOrie(orie)], self.permDB[rankPerm(cube)])
+
+    # The whole cube tables are indexed by the ranks of coord.py, the reduced ones by the rank of
+    # the first 7 cubies (-1 when the DLB cubie is not at home)
+    def coord(self, p, o):
+        if self.perm7 is None:
+            from coord import PERMS, ORIES
+            self.orie7 = [rankOrie(orie[:DLB]) if orie[DLB] == 0 else -1 for orie in ORIES]
+            self.perm7 = [rankPerm(cube[:DLB]) if cube[DLB] == DLB else -1 for cube in PERMS]
+        p7, o7 = self.perm7[p], self.orie7[o]
+        if p7 >= 0 and o7 >= 0:
+            return max(self.orieDB7[o7], self.permDB7[p7])
+        return max(self.orieDB[o], self.permDB[p])
+
+HEURISTICS = [Misplaced, CubieDB, PairDB, CoordDB]
+evaluators = {}
+evaluatorLock = Lock()
+
+# The shared evaluator of a mode (0 .. 3), an evaluator is returned as it is
+def evaluator(mode):
+    if isinstance(mode, Heuristic):
+        return mode
+    h = evaluators.get(mode)
+    if h is None:
+        with evaluatorLock:
+            if mode not in evaluators:
+                evaluators[mode] = HEURISTICS[mode]()
+            h = evaluators[mode]
+    return h
@@ -105,12 +105,13 @@ class RubikCube:
         self.rubik = Rubik()
         self.get_face_color()
 
-    def solve(self, mode):
+    # cache: a cache.SolutionCache, a cached state is not searched again (0 node created / visited)
+    def solve(self, mode, search = A_star, cache = None):
         temp = deepcopy(self.rubik)
         start = time.time()
-        goal = A_star(temp, mode)
+        goal = search(temp, mode) if cache is None else cache.solve(temp, mode, search=search)
         end = time.time()
-        if goal is None: return None
+        if goal is None or goal[0] is None: return None
         return goal[0], goal[1], goal[2], end - start
 
     def nextStep(self, move):
@@ -885,6 +886,7 @@ class Ui_MainWindow(object):
             print("WRONG COLOR")
             self.label.setText("WRONG COLOR")
             self.label.setAlignment(QtCore.Qt.AlignCenter)
+            return
         goalState, self.generated, self.visited, self.time = result
         for c in goalState.route:
             if c.islower():
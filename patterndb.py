@@ -0,0 +1,229 @@
+from array import array
+from mmap import mmap, ACCESS_READ
+from multiprocessing import Pool
+from os import getpid, path, remove, replace
+import struct
+import json
+import sys
+
+'''
+Binary pattern database format (all little-endian)
+
+    header   magic b'RPDB', version, scheme, bits per entry, cubies per table, number of tables, entries per table
+    subsets  the cubies of every table (number of tables * cubies per table bytes), padded to 8 bytes
+    data     the tables one after another, 1 byte per entry (bits = 8), 2 entries per byte (bits = 4,
+             entry i is in byte i // 2, low nibble if i is even) or 2 bytes per entry (bits = 16)
+
+Indexing schemes:
+    SCHEME_CUBIES   each cubie c1..ck of the subset is a digit orie*8 + pos, index = digit1*24^(k-1) + ... + digitk
+    SCHEME_REDUCED  reduced cube index of coord.py (DLB cubie at home), no subset
+    SCHEME_ORIE     rankOrie(orie[:k]) of the cubies at positions 0..k-1 (subset), the others are at home
+    SCHEME_PERM     rankPerm(cube[:k]) of the cubies at positions 0..k-1 (subset), the others are at home
+    SCHEME_MOVE     move table of a coordinate of coord.py, the subset of a table is the index of its move
+                    (into the move string of the coordinate), entry i is the rank of i after that move
+
+Files are memory-mapped: nothing is parsed at load time and processes reading the same file share its pages.
+A file is replaced in one step (rename) when it is saved, never rewritten in place.
+'''
+DATA_DIR = path.dirname(path.abspath(__file__))
+MAGIC = b'RPDB'
+VERSION = 1
+SCHEME_CUBIES, SCHEME_REDUCED, SCHEME_ORIE, SCHEME_PERM, SCHEME_MOVE = 1, 2, 3, 4, 5
+HEADER = struct.Struct('<4sHHBBHI')
+UNKNOWN = 255
+
+class PatternDB:
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self.mm = mmap(f.fileno(), 0, access=ACCESS_READ)
+        magic, self.version, self.scheme, self.bits, k, nTables, self.entries = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or self.version != VERSION:
+            raise ValueError(filename + " is not a version " + str(VERSION) + " pattern database")
+        offset = HEADER.size
+        self.subsets = [tuple(self.mm[offset + i*k : offset + (i+1)*k]) for i in range(nTables)]
+        offset += -(-nTables * k // 8) * 8
+        self.table = memoryview(self.mm)[offset:]      # table[i] is an int, no copy
+
+    # Value of an entry, index is over all the tables (table number * entries + index in the table)
+    def get(self, index):
+        if self.bits == 4:
+            return self.table[index >> 1] >> ((index & 1) << 2) & 15
+        if self.bits == 16:
+            return self.table[2*index] | self.table[2*index + 1] << 8
+        return self.table[index]
+
+    # Every table of a 16 bits database as an array('H') (one copy, faster to index than the mapped file)
+    def arrays(self):
+        tables = []
+        for i in range(len(self.subsets)):
+            table = array('H')
+            table.frombytes(self.table[2*i*self.entries : 2*(i + 1)*self.entries])
+            if sys.byteorder == 'big':
+                table.byteswap()
+            tables.append(table)
+        return tables
+
+# values: one value per entry of every table, one table after another
+def save(filename, scheme, values, subsets = (), bits = 8):
+    k = len(subsets[0]) if subsets else 0
+    nTables = max(len(subsets), 1)
+    if bits == 4:
+        values = bytes(values[i] | values[i + 1] << 4 for i in range(0, len(values) - 1, 2)) + \
+            (bytes([values[-1]]) if len(values) % 2 else b'')
+        entries = len(values) * 2 // nTables
+    elif bits == 16:
+        values = array('H', values)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        entries = len(values) // nTables
+        values = values.tobytes()
+    else:
+        entries = len(values) // nTables
+    subsetBytes = bytes(c for subset in subsets for c in subset)
+    # Written next to the file then renamed over it: a process mapping the file sees the old one or the whole new one
+    temp = "%s.%d.tmp" % (filename, getpid())
+    try:
+        with open(temp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, scheme, bits, k, nTables, entries))
+            f.write(subsetBytes + bytes(-len(subsetBytes) % 8))
+            f.write(bytes(values))
+        replace(temp, filename)
+    finally:
+        if path.exists(temp):
+            remove(temp)
+
+# Lexicographic rank of a permutation of 0 .. n-1
+def rankPerm(p):
+    n = len(p)
+    rank = 0
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if p[j] < p[i]:
+                smaller += 1
+        rank = rank * (n - i) + smaller
+    return rank
+
+# Base-3 rank of the orientation, the last cubie is implied by the others
+def rankOrie(o):
+    rank = 0
+    for i in range(len(o) - 1):
+        rank = rank * 3 + o[i]
+    return rank
+
+# Index of a state of the cubie subset, pos/orie are the position and orientation of each cubie in the subset
+def cubiesIndex(pos, orie):
+    index = 0
+    for p, o in zip(pos, orie):
+        index = index * 24 + o * 8 + p
+    return index
+
+# Where a cubie digit (orie*8 + pos) goes with every move: DIGIT_MOVE[m][digit]
+def digitMoves():
+    from rubik import SOURCE, TWIST
+    digitMove = []
+    for src, twist in zip(SOURCE, TWIST):
+        table = [0] * 24
+        for newPos in range(8):
+            for o in range(3):
+                table[o*8 + src[newPos]] = (o + twist[newPos]) % 3 * 8 + newPos
+        digitMove.append(table)
+    return digitMove
+
+# Distance to the goal of every state of a cubie subset (SCHEME_CUBIES index, UNKNOWN if the state is impossible)
+# One breadth-first search backward from the goal fills the whole table, moves are indexes into rubik.MOVES
+# and must contain the inverse of each move, then the distance from the goal == the distance to the goal
+def buildCubiesTable(subset, moves = range(12)):
+    digitMove = digitMoves()
+    k = len(subset)
+    dist = bytearray([UNKNOWN]) * 24 ** k
+    goal = cubiesIndex(subset, [0] * k)
+    dist[goal] = 0
+    frontier = [goal]
+    depth = 0
+    while frontier:
+        depth += 1
+        nextFrontier = []
+        for index in frontier:
+            digits = []
+            for _ in range(k):
+                index, digit = divmod(index, 24)
+                digits.append(digit)
+            digits.reverse()
+            for m in moves:
+                child = 0
+                for digit in digits:
+                    child = child * 24 + digitMove[m][digit]
+                if dist[child] == UNKNOWN:
+                    dist[child] = depth
+                    nextFrontier.append(child)
+        frontier = nextFrontier
+    return dist
+
+# Build the tables of every subset (in parallel if workers > 1) and save them as one pattern database
+def createDB(filename, subsets, moves = range(12), workers = 1):
+    jobs = [(tuple(subset), moves) for subset in subsets]
+    if workers > 1:
+        with Pool(workers) as pool:
+            tables = pool.starmap(buildCubiesTable, jobs)
+    else:
+        tables = [buildCubiesTable(*job) for job in jobs]
+    save(filename, SCHEME_CUBIES, b''.join(tables), subsets)
+
+# Distance to the goal (index 0) of every value of a coordinate, moveTables[m][index] is the index after move m
+def buildCoordTable(size, moveTables):
+    dist = bytearray([UNKNOWN]) * size
+    dist[0] = 0
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        nextFrontier = []
+        for index in frontier:
+            for table in moveTables:
+                child = table[index]
+                if dist[child] == UNKNOWN:
+                    dist[child] = depth
+                    nextFrontier.append(child)
+        frontier = nextFrontier
+    return dist
+
+# Orientation only and permutation only tables of the whole cube (8 cubies, all moves)
+# and of the reduced cube (7 cubies, DLB at home, moves "UuFfRr")
+COORD_DBS = {
+    'orie': ('orie.bin', SCHEME_ORIE, 8),
+    'perm': ('perm.bin', SCHEME_PERM, 8),
+    'orie7': ('orie7.bin', SCHEME_ORIE, 7),
+    'perm7': ('perm7.bin', SCHEME_PERM, 7),
+}
+def createCoordDBs(directory = DATA_DIR):
+    import coord
+    tables = {
+        'orie': (coord.N_ORIE, coord.ORIE_MOVE),
+        'perm': (coord.N_PERM, coord.PERM_MOVE),
+        'orie7': (coord.N_ORIE7, coord.ORIE_MOVE7),
+        'perm7': (coord.N_PERM7, coord.PERM_MOVE7),
+    }
+    for name, (filename, scheme, k) in COORD_DBS.items():
+        save(path.join(directory, filename), scheme, buildCoordTable(*tables[name]), [tuple(range(k))])
+
+# Convert the json databases (db.json: single cubies, dbPair.json: pairs of cubies) to the binary format
+def convertJson(cubies = path.join(DATA_DIR, 'db.json'), pairs = path.join(DATA_DIR, 'dbPair.json'), pairCubes = None):
+    from rubik import PAIR_CUBES
+    pairCubes = pairCubes or PAIR_CUBES
+
+    db = json.load(open(cubies))
+    values = bytearray([UNKNOWN]) * (8 * 24)
+    for cubie in range(8):
+        for key, value in db[cubie].items():
+            o, p = divmod(int(key), 10)
+            values[cubie * 24 + cubiesIndex([p], [o])] = value
+    save(cubies[:-len('.json')] + '.bin', SCHEME_CUBIES, values, [(cubie,) for cubie in range(8)])
+
+    db = json.load(open(pairs))
+    values = bytearray([UNKNOWN]) * (len(pairCubes) * 24 * 24)
+    for i, (c1, c2) in enumerate(pairCubes):
+        for key, value in db[c1][str(c2)].items():
+            o1, p1, o2, p2 = int(key) // 1000, int(key) // 100 % 10, int(key) // 10 % 10, int(key) % 10
+            values[i * 576 + cubiesIndex([p1, p2], [o1, o2])] = value
+    save(pairs[:-len('.json')] + '.bin', SCHEME_CUBIES, values, pairCubes)
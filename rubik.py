@@ -1,7 +1,8 @@
 from copy import copy, deepcopy
-from os import pardir
+from os import pardir, path
 from queue import Queue
-import json
+from threading import Lock
+from patterndb import PatternDB, COORD_DBS
 import random
 
 '''
@@ -35,17 +36,60 @@ def getColor(p, o):
     if p == -1: return '_'
     return COLOR[p][o]
 
-DB = json.load(open('db.json')) 
-DB2 = json.load(open('dbPair.json'))
+# Pattern databases, see patterndb.py. They are next to this file and only loaded when a heuristic needs them
+# DB[cubie*24 + orie*8 + pos]: moves to bring a single cubie home
+# DB2[pair*576 + (orie1*8 + pos1)*24 + orie2*8 + pos2]: moves to bring both cubies of PAIR_CUBES[pair] home
+DATA_DIR = path.dirname(path.abspath(__file__))
+DB = None
+DB2 = None
+loadLock = Lock()
+
+def loadDB():
+    global DB
+    with loadLock:
+        if DB is None:
+            DB = PatternDB(path.join(DATA_DIR, 'db.bin')).table
+    return DB
+
+def loadDB2():
+    global DB2
+    with loadLock:
+        if DB2 is None:
+            DB2 = PatternDB(path.join(DATA_DIR, 'dbPair.bin')).table
+    return DB2
+
+# DB3: orientation only and permutation only tables (see COORD_DBS), whole cube and reduced cube
+DB3 = None
+def loadDB3():
+    global DB3
+    with loadLock:
+        if DB3 is None:
+            DB3 = [PatternDB(path.join(DATA_DIR, COORD_DBS[name][0])).table for name in ('orie', 'perm', 'orie7', 'perm7')]
+    return DB3
+
+# Load every pattern database now instead of on the first solve (warm up of a long running process)
+def preload():
+    loadDB()
+    loadDB2()
+    loadDB3()
+
+# Heuristic value of a state (estimated number of moves left), see heuristic.py
+def heuristicValue(cube, orie, mode):
+    return heuristicEvaluator(mode)(cube, orie)
+
+def heuristicEvaluator(mode):
+    from heuristic import evaluator
+    return evaluator(mode)
 
 class Rubik:
+    __slots__ = ('cube', 'orie', 'route', 'heuristic')
     mode = 3
 
     def __init__(self, cube = GOAL_POSITION, orie = GOAL_ORIENTATION):
         self.cube = copy(cube)      # Store cube in order of position from 0 -> 7 according to the above convention
         self.orie = copy(orie)      # Store orientation of cubie in order of position from 0 -> 7 according to the above convention
         self.route = str()          # Store moved steps
-        self.heuristic = 0          # Store heuristic value
+        self.heuristic = None       # Store (evaluator, heuristic value)
 
     # Copy constructor
     def copy(self):
@@ -63,20 +107,18 @@ class Rubik:
     def isCorrectPositionCube(self, index):
         return self.cube[index] == index and self.orie[index] == 0
 
-    # Calc heuristic value of current state
-    def getHeuristic(self):
-        if self.heuristic == 0: 
-            if self.mode == 0:
-                self.heuristic = (sum([o != 0 for o in self.orie]) + sum([i != self.cube[i] for i in range(8)])) / 8 + len(self.route)
-            if self.mode == 1:
-                self.heuristic = sum([DB[self.cube[i]][str(self.orie[i]*10+i)] for i in range(8)]) /4 + len(self.route)
-            if self.mode == 2:
-                pos_cubes = [-1] * 8 # Record position of each cube in current state
-                for i in range(8):
-                    pos_cubes[self.cube[i]] = i
-                self.heuristic = sum([DB2[pair[0]][str(pair[1])][str(self.orie[pos_cubes[pair[0]]]*1000 + pos_cubes[pair[0]]*100
-                    + self.orie[pos_cubes[pair[1]]]*10 + pos_cubes[pair[1]])] for pair in PAIR_CUBES]) / 6 + len(self.route)
-        return self.heuristic
+    # Calc heuristic value of current state (estimated number of moves left)
+    # heuristic: a mode or an evaluator (heuristic.py), the class default mode if None
+    # The value is kept with the evaluator that computed it, another evaluator computes its own
+    def estimate(self, heuristic = None):
+        h = heuristicEvaluator(self.mode if heuristic is None else heuristic)
+        if self.heuristic is None or self.heuristic[0] is not h:
+            self.heuristic = (h, h(self.cube, self.orie))
+        return self.heuristic[1]
+
+    # f = g + h, the moved steps are g
+    def getHeuristic(self, heuristic = None):
+        return self.estimate(heuristic) + len(self.route)
 
     # Make the position object hashable, i.e. addable to set()
     def __hash__(self):
@@ -202,8 +244,13 @@ class Rubik:
         return states
 
     # Get the route to move the 7th cube (DLB cube) to the right place (Help to improvement search algorithms)
-    # This method use Breadth - first search to implement
+    # The route only depends on where the DLB cube is, so it is read from standardTable()
     def routeTransformToStandard(self): 
+        pos = self.cube.index(DLB)
+        return standardTable()[pos, self.orie[pos]][0]
+
+    # Same route found with Breadth - first search, only used to build standardTable()
+    def searchRouteToStandard(self): 
         stateQueue = Queue()
         visited = set()
         initState = deepcopy(self)
@@ -223,14 +270,14 @@ class Rubik:
         return None
 
     # Move the 7th cube (DLB cube) to the right place
+    # Each move of the route is paired with the opposite face turned the other way, so the whole cube is rotated
     def transformToStandard(self):
-        route = self.routeTransformToStandard()
-        follow = {'U':'d', 'u':'D', 'D':'u', 'd':'U', 'F':'b', 'f':'B', 'B':'f', 'b':'F', 'R':'l', 'r':'L', 'L':'r', 'l':'R'}
-        moves = ""
-        for move in route:
-            moves += move
-            moves += follow[move]
-        self.moves(moves)
+        pos = self.cube.index(DLB)
+        route, moves, src, twist = standardTable()[pos, self.orie[pos]]
+        cube, orie = self.cube, self.orie
+        self.cube = [cube[s] for s in src]
+        self.orie = [(orie[s] + t) % 3 for s, t in zip(src, twist)]
+        self.route += moves
         return route
 
     # Random face
@@ -272,6 +319,76 @@ class Rubik:
         # Return false if input not valid
         return False
 
+# Where each position takes its cubie from and how much it twists, for every move
+# After move MOVES[m]: cube[p] = old cube[SOURCE[m][p]], orie[p] = (old orie[SOURCE[m][p]] + TWIST[m][p]) % 3
+MOVES = "UuDdRrLlFfBb"
+SOURCE, TWIST = [], []
+for _c in MOVES:
+    _r = Rubik(list(range(8)), [0]*8)
+    getattr(_r, _c)()
+    SOURCE.append(tuple(_r.cube))
+    TWIST.append(tuple(_r.orie))
+
+MOVE_INDEX = {c: i for i, c in enumerate(MOVES)}
+GOAL = (tuple(GOAL_POSITION), tuple(GOAL_ORIENTATION))
+
+# Immutable state for the object based search engines: tuples instead of lists, no __dict__,
+# the hash is computed once and a move returns a new Node
+class Node:
+    __slots__ = ('cube', 'orie', 'route', 'hash', 'heuristic')
+
+    def __init__(self, cube = GOAL_POSITION, orie = GOAL_ORIENTATION, route = ""):
+        self.cube = tuple(cube)
+        self.orie = tuple(orie)
+        self.route = route
+        self.hash = hash((self.cube, self.orie))
+        self.heuristic = None       # Cache of the raw heuristic (see estimate)
+
+    @classmethod
+    def fromRubik(cls, rubik: Rubik):
+        return cls(rubik.cube, rubik.orie, rubik.route)
+
+    def toRubik(self, cls = Rubik):
+        o = cls(list(self.cube), list(self.orie))
+        o.route = self.route
+        return o
+
+    # With an incremental evaluator h (heuristic.py), the child's heuristic comes from this one
+    def move(self, c, h = None):
+        m = MOVE_INDEX[c]
+        cube, orie = self.cube, self.orie
+        node = Node([cube[s] for s in SOURCE[m]], [(orie[s] + t) % 3 for s, t in zip(SOURCE[m], TWIST[m])], self.route + c)
+        if h is not None and h.incremental and self.heuristic is not None:
+            node.heuristic = h.child(self.heuristic, cube, orie, m)
+        return node
+
+    def moves(self, route: str):
+        node = self
+        for c in route:
+            node = node.move(c)
+        return node
+
+    def children(self, moves = "UuFfRr"):
+        return [self.move(c) for c in moves]
+
+    def isGoalState(self):
+        return (self.cube, self.orie) == GOAL
+
+    def isCorrectPositionCube(self, index):
+        return self.cube[index] == index and self.orie[index] == 0
+
+    # h: an evaluator of heuristic.py, always the same one for a node
+    def estimate(self, h):
+        if self.heuristic is None:
+            self.heuristic = h.raw(self.cube, self.orie)
+        return self.heuristic / h.scale
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, o: object) -> bool:
+        return self.hash == o.hash and self.cube == o.cube and self.orie == o.orie
+
 # Translate move table after transform to standard to before
 translate = {
     'u' : { 'U' : 'U', 'd' : 'd', 'u' : 'u', 'D' : 'D', 'R' : 'F', 'l' : 'b', 'r' : 'f', 'L' : 'B', 'F' : 'L', 'b' : 'r', 'f' : 'l', 'B' : 'R' },
@@ -288,10 +405,40 @@ translate = {
     'b' : { 'U' : 'L', 'd' : 'r', 'u' : 'l', 'D' : 'R', 'R' : 'U', 'l' : 'd', 'r' : 'u', 'L' : 'D', 'F' : 'F', 'b' : 'b', 'f' : 'f', 'B' : 'B' },
 }
 
+# There are only 24 ways to hold the cube, one for each place (position, orientation) of the DLB cube
+# standardTable()[position, orientation] = (route, moves of the rotation, SOURCE and TWIST of the rotation)
+STANDARD = None
+def standardTable():
+    global STANDARD
+    if STANDARD is None:
+        follow = {'U':'d', 'u':'D', 'D':'u', 'd':'U', 'F':'b', 'f':'B', 'B':'f', 'b':'F', 'R':'l', 'r':'L', 'L':'r', 'l':'R'}
+        table = {}
+        states = [Rubik()]
+        while len(table) < 24:
+            state = states.pop(0)
+            pos = state.cube.index(DLB)
+            if (pos, state.orie[pos]) not in table:
+                route = state.searchRouteToStandard()
+                moves = ''.join([move + follow[move] for move in route])
+                rotation = Rubik(list(range(8)), [0]*8)
+                rotation.moves(moves)
+                table[pos, state.orie[pos]] = (route, moves, tuple(rotation.cube), tuple(rotation.orie))
+            states.extend(state.getFullChild())
+        STANDARD = table
+    return STANDARD
+
+# translate of a whole transform route composed into one table, translateTables[tranform][move]
+translateTables = {}
+def translateTable(tranform: str):
+    table = translateTables.get(tranform)
+    if table is None:
+        table = {move: move for move in translate}
+        for t in tranform[::-1]:
+            table = {move: translate[t][table[move]] for move in table}
+        translateTables[tranform] = table
+    return table
+
 # Translate moves after transform to standard to before
 def translateMove(tranform: str, moves: str):
-    result = list(moves)
-    for t in tranform[::-1]:
-        for i in range(len(result)): 
-            result[i] = translate[t][result[i]]
-    return ''.join(result)
\ No newline at end of file
+    table = translateTable(tranform)
+    return ''.join([table[move] for move in moves])
\ No newline at end of file
@@ -31,6 +31,8 @@ COLOR = [['W', 'G', 'O'],['W', 'O', 'B'],['W', 'B', 'R'],['W', 'R', 'G'],['Y', '
 DB = json.load(open('db.json')) 
 
 class Rubik:
+    __slots__ = ('p', 'o', 'route', 'heuristic')
+
     def __init__(self, p = GOAL_POSITION, o = GOAL_ORIENTATION):
         self.p = copy(p)
         self.o = copy(o)
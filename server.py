@@ -0,0 +1,234 @@
+import asyncio
+import json
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, get_all_start_methods
+from functools import partial
+from os import cpu_count
+from time import perf_counter
+from rubik import Rubik, MOVES, preload
+from coord import encode
+import solver
+from cache import SolutionCache
+from stats import SearchStats
+
+'''
+Local solve service: HTTP/JSON over asyncio, searches run in a pool of warm worker processes
+
+    POST /solve     {"moves": "RUf..."} or {"colors": [[c, c, c] * 8]} (Rubik.loadColor format)
+                    optional "mode" (0 .. 3, default 3), "search" (see SEARCHES, default "A_star"),
+                    "transform" (default true)
+                    -> {"route", "generated", "visited", "seconds", "shared", "cached", "stats"}
+                    ("stats": stats.SearchStats.asDict() of the search, null for the engines that do not keep them)
+    GET  /metrics   queue depth, in flight searches, latency of the last requests, cache counters
+
+Requests for the same state with the same options while a search for it is running share that
+search ("shared": true in the answer). With a cache (cache.py), solved states are answered from it
+("cached": true, 0 node generated / visited). Nothing leaves the machine, the server listens on localhost.
+'''
+SEARCHES = {
+    'A_star': solver.A_star,
+    'IDA_star': solver.IDA_star,
+    'MA_star': solver.MA_star,
+    'biBFS': solver.biBFS,
+    'layerBFS': solver.layerBFS,
+    'godSolve': solver.godSolve,
+}
+MAX_BODY = 4096        # Bytes, a request is about 200
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Runs in the worker processes
+# Statistics of the search (stats.SearchStats) as a dict if it keeps them, else None
+def _solve(cube, orie, mode, transform, searchName):
+    result = SEARCHES[searchName](Rubik(cube, orie), mode, transform)
+    if result is None or result[0] is None:
+        return None
+    return result[0].route, result[1], result[2], result.asDict() if isinstance(result, SearchStats) else None
+
+class SolveService:
+    def __init__(self, workers = None, window = 1000, cache = None):
+        self.cache = cache
+        self.workers = workers or cpu_count()
+        # Not forked from this process: a forked worker would keep the sockets open at that time (the clients
+        # would never see the connection closed, the port would stay in use)
+        context = get_context('forkserver' if 'forkserver' in get_all_start_methods() else 'spawn')
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=preload)
+        self.inflight = {}                  # (state, options) -> future of the search
+        self.waiting = 0                    # Requests waiting for a search
+        self.latency = deque(maxlen=window) # Seconds of the last requests
+        self.requests = 0
+        self.shared = 0
+        self.errors = 0
+
+    # Start every worker and load its tables now, before the first request
+    def warmUp(self):
+        for future in [self.pool.submit(preload) for _ in range(self.workers)]:
+            future.result()
+
+    # Rubik of a request body, ValueError if it is not a valid state
+    def parseState(self, body):
+        rubik = Rubik()
+        if 'colors' in body:
+            colors = body['colors']
+            if not isinstance(colors, list) or len(colors) != 8 \
+                    or not all(isinstance(c, list) and len(c) == 3 and all(isinstance(x, str) for x in c) for c in colors) \
+                    or not rubik.loadColor(colors):
+                raise ValueError("colors is not a valid cube")
+        elif 'moves' in body:
+            moves = body['moves']
+            if not isinstance(moves, str) or any(c not in MOVES for c in moves):
+                raise ValueError("moves must only have the moves " + MOVES)
+            rubik.moves(moves)
+        else:
+            raise ValueError("colors or moves is needed")
+        return rubik
+
+    async def solve(self, body):
+        start = perf_counter()
+        self.requests += 1
+        rubik = self.parseState(body)
+        mode = body.get('mode', 3)
+        searchName = body.get('search', 'A_star')
+        transform = body.get('transform', True)
+        # type() and not isinstance(): true / false are ints for isinstance
+        if type(mode) is not int or mode not in range(4):
+            raise ValueError("mode must be an integer 0 .. 3")
+        if not isinstance(transform, bool):
+            raise ValueError("transform must be true or false")
+        if not isinstance(searchName, str) or searchName not in SEARCHES:
+            raise ValueError("search must be one of " + ", ".join(SEARCHES))
+        if searchName == 'godSolve':
+            transform = True    # godSolve always transforms, its routes solve the cube up to a rotation
+
+        if self.cache is not None:
+            route = self.cache.get(rubik.cube, rubik.orie, transform)
+            if route is not None:
+                seconds = perf_counter() - start
+                self.latency.append(seconds)
+                return {'route': route, 'generated': 0, 'visited': 0, 'seconds': seconds, 'shared': False, 'cached': True,
+                    'stats': None}
+
+        key = (encode(rubik.cube, rubik.orie), mode, transform, searchName)
+        future = self.inflight.get(key)
+        shared = future is not None
+        if shared:
+            self.shared += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, _solve, rubik.cube, rubik.orie, mode, transform, searchName)
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+            if self.cache is not None:
+                future.add_done_callback(partial(self.remember, rubik, transform))
+        self.waiting += 1
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self.waiting -= 1
+        seconds = perf_counter() - start
+        self.latency.append(seconds)
+        if result is None:
+            return {'route': None, 'shared': shared, 'seconds': seconds, 'cached': False}
+        route, generated, visited, stats = result
+        return {'route': route, 'generated': generated, 'visited': visited, 'seconds': seconds, 'shared': shared, 'cached': False,
+            'stats': stats}
+
+    def remember(self, rubik, transform, future):
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            self.cache.put(rubik.cube, rubik.orie, future.result()[0], transform)
+
+    def metrics(self):
+        latency = sorted(self.latency)
+        def percentile(q):
+            return latency[min(len(latency) - 1, int(q * len(latency)))] if latency else None
+        return {
+            'workers': self.workers,
+            'inflight': len(self.inflight),                             # Searches submitted and not done
+            'queue_depth': max(0, len(self.inflight) - self.workers),   # Searches waiting for a free worker
+            'waiting': self.waiting,                                    # Requests waiting for a search
+            'requests': self.requests,
+            'shared': self.shared,
+            'errors': self.errors,
+            'latency': {'count': len(latency), 'p50': percentile(0.5), 'p95': percentile(0.95), 'max': latency[-1] if latency else None},
+            'cache': self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            status, answer = await self.route(reader)
+        except Exception as e:
+            self.errors += 1
+            status, answer = 500, {'error': str(e)}
+        data = json.dumps(answer).encode()
+        writer.write(("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+            % (status, STATUS[status], len(data))).encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    # Read one request, return (status, answer)
+    async def route(self, reader):
+        requestLine = (await reader.readline()).decode('latin-1').split()
+        if len(requestLine) != 3:
+            return 400, {'error': "bad request line"}
+        method, target, _ = requestLine
+        length = '0'
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                length = value.strip()
+
+        if target == '/metrics':
+            if method != 'GET':
+                return 405, {'error': "use GET"}
+            return 200, self.metrics()
+        if target == '/solve':
+            if method != 'POST':
+                return 405, {'error': "use POST"}
+            try:
+                if not length.isdigit() or int(length) > MAX_BODY:
+                    raise ValueError("Content-Length must be a number of bytes up to %d" % MAX_BODY)
+                body = json.loads(await reader.readexactly(int(length)))
+                if not isinstance(body, dict):
+                    raise ValueError("the body must be a JSON object")
+                return 200, await self.solve(body)
+            except ValueError as e:     # json.JSONDecodeError is a ValueError
+                self.errors += 1
+                return 400, {'error': str(e)}
+            except asyncio.IncompleteReadError:
+                self.errors += 1
+                return 400, {'error': "the body is shorter than Content-Length"}
+        return 404, {'error': "unknown path " + target}
+
+    async def serve(self, host = '127.0.0.1', port = 8000):
+        self.warmUp()
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Local rubik 2x2 solve service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', type=int, default=0, help="number of solutions kept in memory, 0: no cache")
+    parser.add_argument('--cache-file', default=None, help="dbm file that keeps the cached solutions between runs")
+    args = parser.parse_args()
+    cache = SolutionCache(args.cache, args.cache_file) if args.cache > 0 else None
+    service = SolveService(args.workers, cache=cache)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -1,142 +1,628 @@
+from array import array
 from time import time
 from queue import Queue, PriorityQueue
+from collections import deque
+from heapq import heappush, heappop, heapify
+from os import path
 import random
-import json
-from rubik import Rubik, PAIR_CUBES, translateMove
+from rubik import Rubik, Node, PAIR_CUBES, DATA_DIR, MOVES, translateMove
+from heuristic import Heuristic, evaluator
+from arena import NodeArena
+from budget import Budget, BudgetExceeded, CHECK_EVERY
+from stats import SearchStats, clock
+from patterndb import createDB
 
-#import timeout library
-from func_timeout import func_timeout, FunctionTimedOut
+# Open list of A*: heap of (f, -g, order, node)
+# Equal f goes to the deeper node first, then to the first pushed, so every run expands in the same order
+class OpenList:
+    def __init__(self):
+        self.heap = []
+        self.order = 0
 
-# Queue = BFS
-# PriorityQueue = A_Star
+    def put(self, node, f, g):
+        heappush(self.heap, (f, -g, self.order, node))
+        self.order += 1
+
+    # Return the node with the lowest f and its g
+    def get(self):
+        _, g, _, node = heappop(self.heap)
+        return node, -g
+
+    # No route to the goal through the nodes left is shorter (h admissible)
+    def lowerBound(self):
+        return self.heap[0][0] if self.heap else 0
+
+    def empty(self):
+        return not self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+# Open list of BFS: first in, first out, f is not used
+class FifoList:
+    def __init__(self):
+        self.queue = deque()
+
+    def put(self, node, f, g):
+        self.queue.append((node, g))
+
+    def get(self):
+        return self.queue.popleft()
+
+    def lowerBound(self):
+        return self.queue[0][1] if self.queue else 0
+
+    def empty(self):
+        return not self.queue
+
+    def __len__(self):
+        return len(self.queue)
+
+# FifoList = BFS
+# OpenList = A_Star
+# (Queue and PriorityQueue are still accepted and mean the same)
 # H1: mode = 0
 # H2: mode = 1
 # H3: mode = 2
+# H4: mode = 3 (max of orientation only and permutation only tables)
 # Improve: transform = True
 # Not Improve: transform = False
-def A_star(initState: Rubik, mode = 0, transform = True, queue = PriorityQueue): 
-    Rubik.mode = mode
+# symmetry = True: states that are the same up to a symmetry of the cube (see symmetry.py) are visited once
+# Nodes are encoded states in a NodeArena, the route is only built for the goal
+# deadline, max_nodes, max_memory: see budget.py, a BudgetExceeded is returned when one is used up
+# Return a SearchStats (see stats.py), it unpacks as goal, nodeCreated, nodeVisited (goal None if there is no route)
+# hook, every: hook(stats) every `every` expansions
+# timing = True: also time the heuristic apart from the rest (two clock reads per child, off by default)
+def A_star(initState: Rubik, mode = 0, transform = True, queue = OpenList, symmetry = False,
+        deadline = None, max_nodes = None, max_memory = None, hook = None, every = 1, timing = False): 
+    from coord import encode, PERMS, ORIES, PERM_MOVE, ORIE_MOVE, N_ORIE, MOVE_INDEX
+    stats = SearchStats(hook, every)
+    if queue is Queue: queue = FifoList
+    if queue is PriorityQueue: queue = OpenList
+    h = evaluator(mode)
+    # Children from the parent's heuristic, unless the evaluator has its own encoded state tables (cheaper)
+    incremental = h.incremental and type(h).coord is Heuristic.coord
+    budget = Budget.of(deadline, max_nodes, max_memory)
+    origin = initState.copy()
     routeTranform = ""
     if transform: 
         routeTranform = initState.transformToStandard()
+    keyOf = None
+    if symmetry:
+        from symmetry import canonicalIndexer, ALL_SYMS, STANDARD_SYMS
+        keyOf = canonicalIndexer(STANDARD_SYMS if transform else ALL_SYMS)
+    moves = [MOVE_INDEX[c] for c in ("UuFfRr" if transform else "UuFfRrDdBbLl")]
+    arena = NodeArena()
     stateQueue = queue()
-    visited = set()
-    stateQueue.put(initState)
-    visited.add(initState)
     initState.route = ""
+    start = encode(initState.cube, initState.orie)
+    visited = {start if keyOf is None else keyOf(start): 0}    # Best g found for each generated state (or symmetry class)
+    bestH = h(initState.cube, initState.orie)
+    bestNode = arena.add(start, -1, -1, 0)      # Lowest heuristic generated, for BudgetExceeded
+    stateQueue.put(bestNode, bestH, 0)
+    # Raw heuristic of every node (parallel to the arena), a child's is derived from its parent's
+    raws = array('H', [h.raw(initState.cube, initState.orie)]) if incremental else None
     cnt = 0
-    if initState.isGoalState():
-        return initState, len(visited), cnt
+    nextCheck = CHECK_EVERY
+    expanded = 0
+    duplicates = 0
+    pushed = 1                                  # Heuristic evaluations of the children, and the start state
+    openPeak = 1
+    heuristicTime = 0.0
+
+    # Counters of the search so far into stats
+    def record(goal):
+        stats.record(goal, expanded, cnt, duplicates, len(visited), openPeak,
+            pushed, heuristicTime if timing else None)
+        return stats
+
+    if start == 0:
+        return record(initState)
     while not stateQueue.empty():
-        state: Rubik = stateQueue.get() 
-        for nextState in (state.getChildStates() if transform else state.getFullChild()):
+        if budget is not None and cnt >= nextCheck:
+            nextCheck = cnt + CHECK_EVERY
+            reason = budget.exceeded(cnt)
+            if reason is not None:
+                return BudgetExceeded(reason, cnt, len(visited), partialState(origin, arena.route(bestNode), routeTranform), stateQueue.lowerBound(), record(None))
+        node, g = stateQueue.get() 
+        state = arena.state[node]
+        # Lazy deletion: a shorter route to this state was found after this entry was pushed
+        if g > visited[state if keyOf is None else keyOf(state)]:
+            continue
+        expanded += 1
+        p, o = divmod(state, N_ORIE)
+        if incremental:
+            cube, orie, raw = PERMS[p], ORIES[o], raws[node]
+        for m in moves:
             cnt += 1
-            if nextState not in visited:
-                if nextState.isGoalState():
+            nextState = PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+            nextKey = nextState if keyOf is None else keyOf(nextState)
+            if g + 1 < visited.get(nextKey, g + 2):
+                if nextState == 0:
+                    goal = type(initState)()
+                    goal.route = arena.route(node) + MOVES[m]
                     if transform:
-                         nextState.route = translateMove(routeTranform, nextState.route)
-                    return nextState, cnt, len(visited)
-                stateQueue.put(nextState)
-                visited.add(nextState)
+                         goal.route = translateMove(routeTranform, goal.route)
+                    return record(goal)
+                visited[nextKey] = g + 1
+                if timing:
+                    heuristicStart = clock()
+                if incremental:
+                    nextRaw = h.child(raw, cube, orie, m)
+                    raws.append(nextRaw)
+                    nextH = nextRaw / h.scale
+                else:
+                    nextP, nextO = divmod(nextState, N_ORIE)
+                    nextH = h.coord(nextP, nextO)
+                if timing:
+                    heuristicTime += clock() - heuristicStart
+                child = arena.add(nextState, node, m, g + 1)
+                if nextH < bestH:
+                    bestH, bestNode = nextH, child
+                stateQueue.put(child, g + 1 + nextH, g + 1)
+                pushed += 1
+            else:
+                duplicates += 1
+        size = len(stateQueue)
+        if size > openPeak:
+            openPeak = size
+        if hook is not None and expanded % every == 0:
+            hook(record(None))
+    return record(None)
+
+# State reached from the start state of a search by a route of the search (translated back if the search transformed it)
+def partialState(origin: Rubik, route, routeTranform = ""):
+    state = origin.copy()
+    state.route = ""
+    state.moves(translateMove(routeTranform, route) if routeTranform else route)
+    return state
+
+# Raised inside the recursive searches to stop them when their budget is used up
+class OutOfBudget(Exception):
+    def __init__(self, reason):
+        self.reason = reason
+
+# Iterative deepening A*: depth-first search cut off at f = getHeuristic() > bound,
+# the next bound is the smallest f that went over the current one
+# Only the current path is kept, so memory grows with the solution depth, not with the nodes expanded
+# queue is ignored, it is only here so it can be used in place of A_star
+def IDA_star(initState: Rubik, mode = 0, transform = True, queue = None, deadline = None, max_nodes = None, max_memory = None):
+    h = evaluator(mode)
+    budget = Budget.of(deadline, max_nodes, max_memory)
+    origin = initState.copy()
+    routeTranform = ""
+    if transform:
+        routeTranform = initState.transformToStandard()
+    initState.route = ""
+    initState.heuristic = None
+    if initState.isGoalState():
+        return initState, 0, 0
+    moves = "UuFfRr" if transform else "UuFfRrDdBbLl"
+    root = Node.fromRubik(initState)
+    path = {root}           # States on the current path, skip them to avoid cycles
+    cnt = [0, 0]            # Node created, node visited
+    best = [root]           # Lowest heuristic seen, for BudgetExceeded
+    nextCheck = [CHECK_EVERY]
+
+    def search(state: Node, bound):
+        cnt[1] += 1
+        if budget is not None and cnt[0] >= nextCheck[0]:
+            nextCheck[0] = cnt[0] + CHECK_EVERY
+            reason = budget.exceeded(cnt[0])
+            if reason is not None:
+                raise OutOfBudget(reason)
+        if state.heuristic < best[0].heuristic:
+            best[0] = state
+        nextBound = float('inf')
+        # Undoing the last move never helps
+        undo = state.route[-1].swapcase() if state.route else None
+        for c in moves:
+            if c == undo:
+                continue
+            nextState = state.move(c, h)
+            cnt[0] += 1
+            if nextState in path:
+                continue
+            if nextState.isGoalState():
+                return nextState, bound
+            f = len(nextState.route) + nextState.estimate(h)
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+            path.add(nextState)
+            goal, f = search(nextState, bound)
+            path.remove(nextState)
+            if goal is not None:
+                return goal, bound
+            nextBound = min(nextBound, f)
+        return None, nextBound
+
+    bound = root.estimate(h)
+    while bound != float('inf'):
+        try:
+            goal, nextBound = search(root, bound)
+        except OutOfBudget as e:
+            # Every route shorter than bound has been searched
+            return BudgetExceeded(e.reason, cnt[0], cnt[1], partialState(origin, best[0].route, routeTranform), bound)
+        bound = nextBound
+        if goal is not None:
+            goal = goal.toRubik(type(initState))
+            if transform:
+                goal.route = translateMove(routeTranform, goal.route)
+            return goal, cnt[0], cnt[1]
     return None
 
-# Use to calc heuristic value H2 
-def BFS(initState: Rubik, index): 
-    stateQueue = Queue()
-    visited = set()
-    stateQueue.put(initState)
-    visited.add(initState)
+# Memory-bounded A*: optimal like A_star, but never keeps more than max_states states at once
+# (or about max_bytes bytes of search memory, the tables loaded once are not counted)
+# 1. A_star with a node budget that keeps its visited states and open list under the limit, most solves end here
+# 2. If the budget is used up, the lowest f left in its open list is a lower bound of the route length: from
+#    there, iterative deepening (IDA_star) on encoded states, with a table of the states already searched in
+#    this iteration at a lower or equal g (skipped, they can not lead to a shorter route), filled up to the limit
+# queue is the open list of step 1; deadline, max_nodes, max_memory: see budget.py, for both steps together
+# Return a SearchStats (see stats.py), visitedPeak: most states kept at once
+STATE_BYTES = 320           # A_star: arena, visited and open list entry of a state (~260 measured with tracemalloc)
+TABLE_ENTRY_BYTES = 128     # Step 2: dict entry and encoded state (~122 measured)
+MAX_STATES = 1 << 20
+
+def MA_star(initState: Rubik, mode = 0, transform = True, queue = OpenList, max_states = None, max_bytes = None,
+        deadline = None, max_nodes = None, max_memory = None):
+    from math import ceil
+    from coord import encode, PERM_MOVE, ORIE_MOVE, N_ORIE, MOVE_INDEX
+    stats = SearchStats()
+    h = evaluator(mode)
+    budget = Budget.of(deadline, max_nodes, max_memory)
+    if max_states is None and max_bytes is None:
+        max_states = MAX_STATES
+    aStarStates = tableSize = max_states if max_states is not None else float('inf')
+    if max_bytes is not None:
+        aStarStates = min(aStarStates, max_bytes // STATE_BYTES)
+        tableSize = min(tableSize, max_bytes // TABLE_ENTRY_BYTES)
+    # A_star checks its budget every CHECK_EVERY nodes and creates at most 12 more before it stops
+    aStarNodes = aStarStates - CHECK_EVERY - 12
+    if max_nodes is not None:
+        aStarNodes = min(aStarNodes, max_nodes)
+
+    cnt = [0, 0]            # Node created (both steps), node visited (step 2)
+    bound = 0
+    if aStarNodes > 0:
+        result = A_star(initState.copy(), mode, transform, queue, deadline=deadline, max_nodes=aStarNodes, max_memory=max_memory)
+        if not isinstance(result, BudgetExceeded):
+            return result
+        if result.reason != 'nodes' or (max_nodes is not None and result.generated >= max_nodes):
+            return result
+        cnt[0] = result.generated
+        stats.visited = result.visited
+        stats.visitedPeak = result.visited
+        stats.openPeak = result.stats.openPeak
+        stats.expanded = result.stats.expanded
+        stats.duplicates = result.stats.duplicates
+        stats.heuristicEvaluations = result.stats.heuristicEvaluations
+        bound = result.lowerBound
+
+    routeTranform = ""
+    if transform:
+        routeTranform = initState.transformToStandard()
+    start = encode(initState.cube, initState.orie)
+    moves = [MOVE_INDEX[c] for c in ("UuFfRr" if transform else "UuFfRrDdBbLl")]
+    # Routes have a whole number of moves, so the bounds can be rounded up
+    bound = ceil(max(bound, h.coord(*divmod(start, N_ORIE))))
+    table = {}              # State -> lowest g it was searched at in this iteration
+    route = []
+    nextCheck = [cnt[0] + CHECK_EVERY]
+    counts = [0, 0]         # Duplicates, heuristic evaluations
+
+    # None if the goal was found (route is then its route), else the lowest f over the bound
+    def search(state, g, bound, undo):
+        cnt[1] += 1
+        if budget is not None and cnt[0] >= nextCheck[0]:
+            nextCheck[0] = cnt[0] + CHECK_EVERY
+            reason = budget.exceeded(cnt[0])
+            if reason is not None:
+                raise OutOfBudget(reason)
+        p, o = divmod(state, N_ORIE)
+        nextBound = float('inf')
+        for m in moves:
+            # Undoing the last move never helps (moves and their inverses are pairs of MOVES)
+            if m == undo:
+                continue
+            cnt[0] += 1
+            nextState = PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+            if nextState == 0:
+                if g + 1 <= bound:
+                    route.append(m)
+                    return None
+                nextBound = min(nextBound, g + 1)
+                continue
+            seen = table.get(nextState)
+            if seen is not None and seen <= g + 1:
+                counts[0] += 1
+                continue
+            counts[1] += 1
+            f = g + 1 + h.coord(*divmod(nextState, N_ORIE))
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+            if seen is not None or len(table) < tableSize:
+                table[nextState] = g + 1
+            route.append(m)
+            f = search(nextState, g + 1, bound, m ^ 1)
+            if f is None:
+                return None
+            route.pop()
+            nextBound = min(nextBound, f)
+        return nextBound
+
+    # Counters of both steps into stats, visitedPeak is the larger of the A_star states and the table
+    def record(goal):
+        visitedPeak = stats.visitedPeak
+        stats.record(goal, stats.expanded + cnt[1], cnt[0], stats.duplicates + counts[0], stats.visited + cnt[1],
+            stats.openPeak, stats.heuristicEvaluations + counts[1])
+        stats.visitedPeak = visitedPeak
+        return stats
+
+    found = start == 0
+    while not found:
+        table.clear()
+        table[start] = 0
+        try:
+            nextBound = search(start, 0, bound, -1)
+        except OutOfBudget as e:
+            # Every route shorter than bound has been searched
+            stats.visitedPeak = max(stats.visitedPeak, len(table))
+            return BudgetExceeded(e.reason, cnt[0], stats.visited + cnt[1], None, bound, record(None))
+        stats.visitedPeak = max(stats.visitedPeak, len(table))
+        found = nextBound is None
+        if nextBound == float('inf'):
+            return record(None)
+        if not found:
+            bound = ceil(nextBound)
+    table.clear()
+
+    goal = type(initState)()
+    goal.route = "".join([MOVES[m] for m in route])
+    if transform:
+        goal.route = translateMove(routeTranform, goal.route)
+    return record(goal)
+
+# Anytime weighted A* (ARA*): a first route fast with f = g + w * h, then w goes down the list of weights
+# and every search reuses the g values of the previous ones, only the states whose g got better
+# since they were expanded (INCONS) are expanded again
+# Yield (goal, node created, node visited, bound) every time the route or its bound gets better, the route
+# is at most bound times longer than the optimal one, bound = 1 is optimal and the last one
+# Stop early when the budget (deadline, max_nodes, max_memory, see budget.py) is used up: the last item yielded
+# is then a BudgetExceeded, best: the best route found (None if there is none yet), lowerBound: min g + h left
+def ARA_star(initState: Rubik, mode = 0, transform = True, weights = (3, 2, 1.5, 1.2, 1),
+        deadline = None, max_nodes = None, max_memory = None):
+    from coord import encode, PERM_MOVE, ORIE_MOVE, N_ORIE, MOVE_INDEX
+    h = evaluator(mode)
+    budget = Budget.of(deadline, max_nodes, max_memory)
+    nextCheck = CHECK_EVERY
+    routeTranform = ""
+    if transform: 
+        routeTranform = initState.transformToStandard()
     initState.route = ""
-    if initState.isCorrectPositionCube(index):
-        return initState
-    while not stateQueue.empty():
-        state = stateQueue.get() 
-        for nextState in state.getChildStates():
-            if nextState not in visited:
-                if nextState.isCorrectPositionCube(index):
-                    return nextState
-                stateQueue.put(nextState)
-                visited.add(nextState) 
+    start = encode(initState.cube, initState.orie)
+    if start == 0:
+        yield initState, 0, 0, 1
+        return
+    moves = [MOVE_INDEX[c] for c in ("UuFfRr" if transform else "UuFfRrDdBbLl")]
+    arena = NodeArena()
+    best = {start: arena.add(start, -1, -1, 0)}     # Best node (lowest g) of each generated state
+    hValue = {start: h.coord(*divmod(start, N_ORIE))}
+    inf = float('inf')
+    goalG = inf
+    cnt = [0, 0]        # Node created, node visited
+    opened = {start}    # States in the open list
+    incons = set()
+    last = None         # (goalG, bound) of the last yield
+
+    # The best route to the goal found so far
+    def goalFound():
+        goal = type(initState)()
+        goal.route = arena.route(best[0])
+        if transform:
+            goal.route = translateMove(routeTranform, goal.route)
+        return goal
+
+    for w in weights:
+        closed = set()
+        heap = []
+        opened |= incons
+        incons = set()
+        for state in opened:
+            heap.append((arena.g[best[state]] + w * hValue[state], -arena.g[best[state]], state))
+        heapify(heap)
+        while heap and heap[0][0] < goalG:
+            if budget is not None and cnt[0] >= nextCheck:
+                nextCheck = cnt[0] + CHECK_EVERY
+                reason = budget.exceeded(cnt[0])
+                if reason is not None:
+                    lower = min([arena.g[best[state]] + hValue[state] for state in opened | incons], default=goalG)
+                    yield BudgetExceeded(reason, cnt[0], cnt[1], goalFound() if goalG != inf else None, min(lower, goalG))
+                    return
+            _, g, state = heappop(heap)
+            g = -g
+            # Lazy deletion: expanded in this search or a better g was found after this entry was pushed
+            if state in closed or g != arena.g[best[state]]:
+                continue
+            opened.discard(state)
+            closed.add(state)
+            cnt[1] += 1
+            node = best[state]
+            p, o = divmod(state, N_ORIE)
+            for m in moves:
+                cnt[0] += 1
+                nextState = PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+                if nextState in best and arena.g[best[nextState]] <= g + 1:
+                    continue
+                best[nextState] = arena.add(nextState, node, m, g + 1)
+                if nextState == 0:
+                    goalG = g + 1
+                    continue
+                if nextState not in hValue:
+                    hValue[nextState] = h.coord(*divmod(nextState, N_ORIE))
+                if nextState in closed:
+                    incons.add(nextState)
+                else:
+                    opened.add(nextState)
+                    heappush(heap, (g + 1 + w * hValue[nextState], -(g + 1), nextState))
+        if goalG == inf:
+            continue
+        # Every route is at least min(g + h) over the states left to expand
+        lower = min([arena.g[best[state]] + hValue[state] for state in opened | incons], default=goalG)
+        bound = max(min(w, goalG / lower) if lower > 0 else w, 1)
+        if (goalG, bound) != last:
+            last = (goalG, bound)
+            yield goalFound(), cnt[0], cnt[1], bound
+        if bound == 1:
+            return
+
+# Bidirectional breadth-first search: one frontier from initState, one from the goal,
+# always expand a whole layer of the smaller one and stop at the layer where they meet
+# Every move has its inverse in the move set, so the goal side can use the same children
+# mode and queue are ignored, they are only here so it can be used in place of A_star
+def biBFS(initState: Rubik, mode = 0, transform = True, queue = None, deadline = None, max_nodes = None, max_memory = None):
+    from coord import encode, PERM_MOVE, ORIE_MOVE, N_ORIE, MOVE_INDEX
+    budget = Budget.of(deadline, max_nodes, max_memory)
+    routeTranform = ""
+    if transform:
+        routeTranform = initState.transformToStandard()
+    initState.route = ""
+    start = encode(initState.cube, initState.orie)
+    if start == 0:
+        return initState, 0, 1
+    moves = [MOVE_INDEX[c] for c in ("UuFfRr" if transform else "UuFfRrDdBbLl")]
+    arena = NodeArena()
+    visited = [{start: arena.add(start, -1, -1, 0)}, {0: arena.add(0, -1, -1, 0)}]     # State -> node, for each side
+    frontiers = [[start], [0]]
+    depths = [0, 0]         # Layers done on each side
+    cnt = 0
+    nextCheck = CHECK_EVERY
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = visited[side], visited[1 - side]
+        best = None
+        nextFrontier = []
+        for state in frontiers[side]:
+            if budget is not None and cnt >= nextCheck:
+                nextCheck = cnt + CHECK_EVERY
+                reason = budget.exceeded(cnt)
+                if reason is not None:
+                    # The two sides have not met yet
+                    return BudgetExceeded(reason, cnt, len(visited[0]) + len(visited[1]), None, depths[0] + depths[1] + 1)
+            node = own[state]
+            p, o = divmod(state, N_ORIE)
+            for m in moves:
+                cnt += 1
+                nextState = PERM_MOVE[m][p] * N_ORIE + ORIE_MOVE[m][o]
+                if nextState in own:
+                    continue
+                own[nextState] = arena.add(nextState, node, m, arena.g[node] + 1)
+                if nextState in other:
+                    meet = (own[nextState], other[nextState]) if side == 0 else (other[nextState], own[nextState])
+                    if best is None or arena.g[meet[0]] + arena.g[meet[1]] < arena.g[best[0]] + arena.g[best[1]]:
+                        best = meet
+                nextFrontier.append(nextState)
+        if best is not None:
+            forward, backward = best
+            # The goal side route is from the goal to the meeting state, undo it in reverse order
+            goal = type(initState)()
+            goal.route = arena.route(forward) + arena.route(backward)[::-1].swapcase()
+            if transform:
+                goal.route = translateMove(routeTranform, goal.route)
+            return goal, cnt, len(visited[0]) + len(visited[1])
+        frontiers[side] = nextFrontier
+        depths[side] += 1
     return None
 
+# Optimal solve by walking down the god's algorithm table (see godtable.py)
+# The reduced table needs the DLB cubie at home, so the cube is always transformed to standard first
+# mode and queue are ignored, they are only here so it can be used in place of A_star
+# The table and the move tables it needs are only loaded on the first call
+godTable = None
+def getGodTable():
+    global godTable
+    if godTable is None:
+        from godtable import GodTable
+        godTable = GodTable()
+    return godTable
+
+# It is at most 14 table steps, the budget arguments are accepted and ignored
+def godSolve(initState: Rubik, mode = 0, transform = True, queue = None, deadline = None, max_nodes = None, max_memory = None):
+    from coord import encodeReduced
+    routeTranform = initState.transformToStandard()
+    route, cnt = getGodTable().route(encodeReduced(initState.cube, initState.orie))
+    goal = initState.copy()
+    goal.moves(route)
+    goal.route = translateMove(routeTranform, route)
+    return goal, cnt, len(route) + 1
+
+# Level-synchronous breadth-first search (see vectorized.py): a whole depth layer of encoded states at a time
+# mode and queue are ignored, they are only here so it can be used in place of A_star
+# The budget is checked after every layer
+def layerBFS(initState: Rubik, mode = 0, transform = True, queue = None, deadline = None, max_nodes = None, max_memory = None):
+    import vectorized
+    from coord import encode, encodeReduced
+    routeTranform = ""
+    if transform:
+        routeTranform = initState.transformToStandard()
+        start = encodeReduced(initState.cube, initState.orie)
+    else:
+        start = encode(initState.cube, initState.orie)
+    result = vectorized.search(start, lambda states: states == 0, reduced=transform, budget=Budget.of(deadline, max_nodes, max_memory))
+    if result is None or isinstance(result, BudgetExceeded):
+        return result
+    _, route, generated, visited = result
+    goal = type(initState)()
+    goal.route = translateMove(routeTranform, route) if transform else route
+    return goal, generated, visited
+
+# Closest state where every cubie of indexes is at its place (isCorrectPositionCube)
+def correctPositionSearch(initState: Rubik, indexes, moves):
+    import vectorized
+    from coord import encode, decode
+    initState.route = ""
+    result = vectorized.search(encode(initState.cube, initState.orie), lambda states: vectorized.correctPosition(states, indexes), moves)
+    if result is None:
+        return None
+    state = type(initState)(*decode(result[0]))
+    state.route = result[1]
+    return state
+
+# Use to calc heuristic value H2 
+def BFS(initState: Rubik, index): 
+    return correctPositionSearch(initState, [index], "UuFfRr")
+
 # Use to calc heuristic value H3
 def BFS2(initState: Rubik, index1, index2): 
-    stateQueue = Queue()
-    visited = set()
-    stateQueue.put(initState)
-    visited.add(initState)
-    initState.route = ""
-    if initState.isCorrectPositionCube(index1) and initState.isCorrectPositionCube(index2):
-        return initState
-    while not stateQueue.empty():
-        state = stateQueue.get() 
-        for nextState in state.getFullChild():
-            if nextState not in visited:
-                if nextState.isCorrectPositionCube(index1) and nextState.isCorrectPositionCube(index2):
-                    return nextState
-                stateQueue.put(nextState)
-                visited.add(nextState) 
-    return None
+    return correctPositionSearch(initState, [index1, index2], "UuFfRrDdBbLl")
+
+# Create pattern database H2: distance of every single cubie to its place
+def creatDB1(workers = 1):
+    createDB(path.join(DATA_DIR, 'db.bin'), [(cubie,) for cubie in range(8)], workers=workers)
 
-# Create pattern database H2
-def creatDB1():
-    db = []
-    for i in range(8):
-        db.append(dict())
-        for o in range(3):
-            for p in range(8):
-                init = Rubik()
-                ps = [-1]*8
-                os = [0]*8
-                ps[p] = i
-                os[p] = o
-                init.init(ps, os)
-                db[i][o * 10 + p] = len(BFS(init, i).route)
-    json.dump(db, open('db2.json', 'w'))
-
-# Create pattern database H3 
-def createDB2():
-    db = [{} for _ in range(7)]
-    for c in PAIR_CUBES:
-        print(c)
-        db[c[0]+c[1]] = dict()
-        for o1 in range(3):
-            for p1 in range(8):
-                for o2 in range(3):
-                    for p2 in range(8):
-                        if p1 != p2:
-                            ps = [-1]*8
-                            os = [0]*8
-                            ps[c[0]] = p1
-                            os[p1] = o1
-                            ps[c[1]] = p2
-                            os[p2] = o2
-                            init = Rubik(ps, os)
-                            new_state = BFS2(init, p1, p2)
-                            db[c[0]+c[1]][o1*1000+p1*100+o2*10+p2] = len(new_state.route)
-                            
-
-    json.dump(db, open('dbPair.json', 'w'))
+# Create pattern database H3: distance of every pair of PAIR_CUBES to their places
+def createDB2(workers = 1):
+    createDB(path.join(DATA_DIR, 'dbPair.bin'), PAIR_CUBES, workers=workers)
 
 # Use to test algorithm
-def randomMove(n):
+def randomMove(n, rng = random):
     S = "UuDdRrLlFfBb"
     s = ""
     for i in range(n):
-        s += S[random.randrange(12)]
+        s += S[rng.randrange(12)]
     return s
 
-# make a list of random testcase
-randomlist= list()
-for i in range(20):
-    shuff = randomMove(50)
-    randomlist.append(shuff)
-print(randomlist)
+# make a list of random testcase, the same for the same seed
+def randomList(n, length = 50, seed = 0):
+    rng = random.Random(seed)
+    return [randomMove(length, rng) for i in range(n)]
 
-# Randomly run N times
-def runN(n, mode, transform, queue):
+# Randomly run N times (see benchmark.py for timings on a fixed corpus)
+def runN(n, mode, transform, queue, search = A_star, seed = 0):
     maxStep = 0
     caseMax = ""
+    randomlist = randomList(n, 50, seed)
     for i in range(n):
         init = Rubik()
         shuffle = randomlist[i]
@@ -147,12 +633,12 @@ def runN(n, mode, transform, queue):
         init.moves(shuffle)
 
         s = time()
-        # set timeout 300s = 5 minute
-        try:
-            goal, nodeCreated, nodeVisited = func_timeout(300, A_star, args=(init, mode, transform, queue))
-        except FunctionTimedOut:
+        # stop after 300s = 5 minute
+        result = search(init, mode, transform, queue, deadline=s + 300)
+        if isinstance(result, BudgetExceeded):
+            print("Out of budget:", result)
             continue
-        # goal, nodeCreated, nodeVisited = A_star(init, mode, transform, queue)
+        goal, nodeCreated, nodeVisited = result
         e = time()
 
         if len(goal.route) > maxStep:
@@ -186,29 +672,49 @@ def run1(str, mode, transform):
 
 if __name__ == '__main__':
       #A* + h1 + improved
-    runN(20, 0, True, PriorityQueue)
+    runN(20, 0, True, OpenList)
     print("end 1 test")
 
     #A* + h1 +  not improved
-    runN(20, 0, False, PriorityQueue)
+    runN(20, 0, False, OpenList)
     print("end 2 test")
 
     #A* + h2 + improved
-    runN(20, 1, True, PriorityQueue)
+    runN(20, 1, True, OpenList)
     print("end 3 test")
 
     #A* + h2 + not improved
-    runN(20, 1, False, PriorityQueue)
+    runN(20, 1, False, OpenList)
     print("end 4 test")
 
     #A* + h3 + improved
-    runN(20, 2, True, PriorityQueue)
+    runN(20, 2, True, OpenList)
     print("end 5 test")
 
     #A* + h3 + not improved
-    runN(20, 2, False, PriorityQueue)
+    runN(20, 2, False, OpenList)
     print("end 6 test")
 
+    #A* + h4 + improved
+    runN(20, 3, True, OpenList)
+    print("end 6b test")
+
+    #A* + h4 + not improved
+    runN(20, 3, False, OpenList)
+    print("end 6c test")
+
     #BFS + improved
-    runN(20, 0, True, Queue)
+    runN(20, 0, True, FifoList)
+    print("end 7 test")
+
+    #IDA* + h1 + improved
+    runN(20, 0, True, None, IDA_star)
+    print("end 8 test")
+
+    #Bidirectional BFS + improved
+    runN(20, 0, True, None, biBFS)
+    print("end 9 test")
+
+    #Level-synchronous BFS + improved
+    runN(20, 0, True, None, layerBFS)
     print("end all test")
\ No newline at end of file
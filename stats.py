@@ -0,0 +1,88 @@
+from time import perf_counter as clock
+
+'''
+Search statistics
+
+What a search did, returned by A_star in place of its old (goal, node created, node visited) tuple.
+It still unpacks (and indexes) like that tuple: goal, nodeCreated, nodeVisited = stats
+goal is None when there is no route to the goal.
+
+    expanded              states taken from the open list and expanded
+    generated             children created (node created)
+    duplicates            children dropped, their state was already reached by a route as short
+    visited               states reached (node visited), visitedPeak: most states kept at once
+    openPeak              most entries in the open list at once
+    heuristicEvaluations  heuristic values computed
+    heuristicTime         seconds spent in the heuristic, expansionTime: in everything else
+                          (None unless the search was asked to time them, see A_star timing)
+    wallTime              seconds of the whole search
+
+hook(stats) is called every `every` expansions with the statistics so far (every = 1: after every
+expansion, more: sampling), to follow a slow search while it runs.
+'''
+class SearchStats:
+    def __init__(self, hook = None, every = 1):
+        self.goal = None
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.visited = 0
+        self.visitedPeak = 0
+        self.openPeak = 0
+        self.heuristicEvaluations = 0
+        self.heuristicTime = None
+        self.expansionTime = None
+        self.wallTime = 0.0
+        self.hook = hook
+        self.every = every
+        self.start = clock()
+
+    # Counters of the search so far (kept in local variables while it runs), goal None if there is no route (yet)
+    # heuristicTime None: not measured, the split of the time is unknown
+    def record(self, goal, expanded, generated, duplicates, visited, openPeak, heuristicEvaluations, heuristicTime = None):
+        self.goal = goal
+        self.expanded = expanded
+        self.generated = generated
+        self.duplicates = duplicates
+        self.visited = visited
+        self.visitedPeak = max(self.visitedPeak, visited)
+        self.openPeak = openPeak
+        self.heuristicEvaluations = heuristicEvaluations
+        self.wallTime = clock() - self.start
+        self.heuristicTime = heuristicTime
+        self.expansionTime = None if heuristicTime is None else self.wallTime - heuristicTime
+        return self
+
+    def __iter__(self):
+        return iter((self.goal, self.generated, self.visited))
+
+    def __getitem__(self, i):
+        return (self.goal, self.generated, self.visited)[i]
+
+    def __len__(self):
+        return 3
+
+    # Numbers only, for JSON
+    def asDict(self):
+        return {
+            'route': self.goal.route if self.goal is not None else None,
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'visited': self.visited,
+            'visitedPeak': self.visitedPeak,
+            'openPeak': self.openPeak,
+            'heuristicEvaluations': self.heuristicEvaluations,
+            'heuristicTime': self.heuristicTime,
+            'expansionTime': self.expansionTime,
+            'wallTime': self.wallTime,
+        }
+
+    # Pickled without the hook (results are sent back from worker processes, see batch.py)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['hook'] = None
+        return state
+
+    def __repr__(self):
+        return "SearchStats(%s)" % ", ".join("%s=%s" % item for item in self.asDict().items())
@@ -0,0 +1,161 @@
+from itertools import permutations, product
+from rubik import COLOR, MOVES, SOURCE, TWIST
+from patterndb import rankPerm, rankOrie
+
+'''
+The 48 symmetries of the cube (24 rotations and their mirror images)
+
+A symmetry maps every face to a face and keeps opposite faces opposite. Conjugating a state by a
+symmetry (turn the whole cube / look at it in a mirror, then recolor every sticker with the color of
+the face it now belongs to) gives a state with the same distance to the goal: the goal is fixed by every
+symmetry and every move becomes another move (MOVE_MAP).
+
+Sticker j of position p is on face SLOT_FACE[p][j] and its color is COLOR[cube[p]][(orie[p] - j) % 3]
+'''
+FACES = "UDLRFB"
+OPPOSITE = {'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L', 'F': 'B', 'B': 'F'}
+SLOT_FACE = ["UBL", "URB", "UFR", "ULF", "DFL", "DRF", "DBR", "DLB"]
+FACE_COLOR = {'U': 'w', 'D': 'y', 'F': 'r', 'B': 'o', 'L': 'g', 'R': 'b'}
+COLOR_FACE = {c: f for f, c in FACE_COLOR.items()}
+
+def positionOf(faces):
+    for p in range(8):
+        if set(SLOT_FACE[p]) == set(faces):
+            return p
+
+# Every face permutation that keeps opposite faces opposite, the identity is the first one
+def allFaceMaps():
+    maps = []
+    for axes in permutations(["UD", "LR", "FB"]):
+        for flips in product((0, 1), repeat=3):
+            faceMap = {}
+            for (a, b), target, flip in zip(["UD", "LR", "FB"], axes, flips):
+                faceMap[a], faceMap[b] = (target[1], target[0]) if flip else (target[0], target[1])
+            maps.append(faceMap)
+    return maps
+
+# Where the cubie c with orientation o at position p goes: (new position, new cubie, new orientation)
+def conjugateCubie(faceMap, p, c, o):
+    newP = positionOf([faceMap[f] for f in SLOT_FACE[p]])
+    newC = positionOf([faceMap[COLOR_FACE[color]] for color in COLOR[c]])
+    # Color of each sticker of the new position
+    colors = [None] * 3
+    for j in range(3):
+        newJ = SLOT_FACE[newP].index(faceMap[SLOT_FACE[p][j]])
+        colors[newJ] = FACE_COLOR[faceMap[COLOR_FACE[COLOR[c][(o - j) % 3]]]]
+    for newO in range(3):
+        if all(COLOR[newC][(newO - j) % 3] == colors[j] for j in range(3)):
+            return newP, newC, newO
+
+# Conjugation table of every symmetry: CONJUGATE[s][p][c*3 + o] = (new position, new cubie, new orientation)
+FACE_MAPS = allFaceMaps()
+CONJUGATE = [[[conjugateCubie(faceMap, p, c, o) for c in range(8) for o in range(3)] for p in range(8)] for faceMap in FACE_MAPS]
+
+def conjugate(cube, orie, sym):
+    table = CONJUGATE[sym]
+    newCube, newOrie = [0]*8, [0]*8
+    for p in range(8):
+        newP, newC, newO = table[p][cube[p]*3 + orie[p]]
+        newCube[newP], newOrie[newP] = newC, newO
+    return newCube, newOrie
+
+def applyMove(cube, orie, m):
+    src, twist = SOURCE[m], TWIST[m]
+    return [cube[s] for s in src], [(orie[s] + t) % 3 for s, t in zip(src, twist)]
+
+# MOVE_MAP[s][m]: the move that does on the conjugated state what MOVES[m] does on the state
+# (conjugate(move(x)) == MOVE_MAP move(conjugate(x)))
+def buildMoveMap(sym):
+    cube, orie = list(range(8)), [0]*8
+    for m in (0, 4, 8, 1, 5, 2):    # Any state that no two moves map to the same state
+        cube, orie = applyMove(cube, orie, m)
+    moveMap = []
+    for m in range(len(MOVES)):
+        target = conjugate(*applyMove(cube, orie, m), sym)
+        conj = conjugate(cube, orie, sym)
+        moveMap.append(next(n for n in range(len(MOVES)) if applyMove(*conj, n) == target))
+    return moveMap
+MOVE_MAP = [buildMoveMap(sym) for sym in range(len(FACE_MAPS))]
+
+# All symmetries, for searches with all 12 moves
+ALL_SYMS = list(range(len(FACE_MAPS)))
+# Symmetries that keep the DLB cubie at home, they also keep the moves "UuFfRr", for searches after transformToStandard
+STANDARD_SYMS = [sym for sym in ALL_SYMS if FACE_MAPS[sym]['D'] in "DLB" and FACE_MAPS[sym]['L'] in "DLB" and FACE_MAPS[sym]['B'] in "DLB"]
+
+'''
+Conjugation on the ranks (coord.encode), to get the key of a state in a few table lookups per symmetry
+
+A symmetry moves the cubie c at position p to position SIGMA[p] and makes it cubie SIGMA[c], with the
+orientation SIGN * o + TWIST_AT[p][c]. So the new permutation rank depends on the permutation rank only,
+and TWIST_AT[p][c] - TWIST_AT[p][p] (zero at home) is a shift of the orientation that depends on the
+permutation only: there are a few different shifts (one for the symmetries that keep the U-D axis, 70
+for the others). Tables of a symmetry s:
+    permSym[perm rank]                      permutation rank of the conjugate
+    shiftId[perm rank]                      which shift the permutation gives
+    orieSym[shift id * N_ORIE + orie rank]  orientation rank of the conjugate
+They are built with NumPy when a symmetry is first used (about 15 ms and up to 430 kB each, 16 MB for all 48).
+'''
+_symTables = {}
+_ranks = None               # PERMS and ORIES as NumPy arrays
+
+def symTables(s):
+    tables = _symTables.get(s)
+    if tables is None:
+        global _ranks
+        import numpy as np
+        from array import array
+        if _ranks is None:
+            from coord import PERMS, ORIES
+            _ranks = (np.array(PERMS, dtype=np.uint8), np.array(ORIES, dtype=np.uint8))
+        perms, ories = _ranks
+        place = np.arange(8)
+        sigma = np.array([CONJUGATE[s][p][0][0] for p in range(8)], dtype=np.uint8)
+        inverse = np.argsort(sigma)
+        sign = (CONJUGATE[s][0][1][2] - CONJUGATE[s][0][0][2]) % 3
+        twistAt = np.array([[CONJUGATE[s][p][c*3][2] for c in range(8)] for p in range(8)], dtype=np.uint8)
+        rankOrie = lambda o: o[..., :7].astype(np.uint16) @ (3 ** np.arange(6, -1, -1, dtype=np.uint16))
+        rank = np.zeros(len(perms), dtype=np.uint16)
+        moved = sigma[perms[:, inverse]]
+        for i in range(8):
+            rank = rank * (8 - i) + (moved[:, i + 1:] < moved[:, i:i + 1]).sum(axis=1, dtype=np.uint16)
+        shifts = sign * (3 + twistAt[place, perms] - twistAt[place, place]) % 3
+        _, first, ids = np.unique(rankOrie(shifts), return_index=True, return_inverse=True)
+        # Conjugate of every orientation plus every shift, as if the cubies were at home
+        moved = (sign * (ories[None, :, :] + shifts[first][:, None, :]) + twistAt[place, place]) % 3
+        tables = (array('H', rank.tobytes()), array('B', ids.astype(np.uint8).tobytes()),
+            array('H', rankOrie(moved[:, :, inverse]).ravel().tobytes()))
+        _symTables[s] = tables
+    return tables
+
+# Function index -> index of the representative of its symmetry class (indexes of coord.encode), over syms:
+# the smallest index of all its conjugates, the smallest permutation first, then the orientations of the
+# symmetries that give it
+def canonicalIndexer(syms = ALL_SYMS):
+    from coord import N_ORIE
+    tables = [symTables(s) for s in syms]
+    def canonicalIndex(index):
+        p, o = divmod(index, N_ORIE)
+        best = min([perm[p] for perm, _, _ in tables])
+        return best * N_ORIE + min([orie[ids[p] * N_ORIE + o] for perm, ids, orie in tables if perm[p] == best])
+    return canonicalIndex
+
+# Representative of the symmetry class and the symmetry that gives it: (index, cube, orie, sym)
+def canonical(cube, orie, syms = ALL_SYMS):
+    best = None
+    for sym in syms:
+        c, o = conjugate(cube, orie, sym)
+        key = rankPerm(c) * 2187 + rankOrie(o)
+        if best is None or key < best[0]:
+            best = (key, c, o, sym)
+    return best
+
+# A route that solves a state, rewritten to solve its conjugate by sym
+def mapRoute(sym, route):
+    moveMap = MOVE_MAP[sym]
+    return ''.join(MOVES[moveMap[MOVES.index(c)]] for c in route)
+
+# A route that solves the conjugate of a state by sym, rewritten to solve the state itself
+def mapRouteBack(sym, route):
+    moveMap = MOVE_MAP[sym]
+    back = {MOVES[moveMap[m]]: MOVES[m] for m in range(len(MOVES))}
+    return ''.join(back[c] for c in route)
@@ -0,0 +1,28 @@
+from arena import NodeArena, packRoute, unpackRoute
+from rubik import MOVES
+from coord import encode, applyMove
+from test_coord import scrambles, scrambled
+
+'''
+Node store (arena.py): routes rebuilt from the parents, packed routes
+'''
+def test_nodeArena():
+    arena = NodeArena()
+    root = arena.add(0, -1, -1, 0)
+    assert arena.route(root) == "" and len(arena) == 1
+    # One chain of nodes per scramble, all from the same root
+    for route in scrambles(20, 10):
+        index = root
+        for move in route:
+            m = MOVES.index(move)
+            index = arena.add(applyMove(arena.state[index], m), index, m, arena.g[index] + 1)
+        assert arena.route(index) == route and arena.g[index] == len(route)
+        state = scrambled(route)
+        assert arena.state[index] == encode(state.cube, state.orie)
+    assert len(arena) == 1 + 20 * 10
+
+def test_packRoute():
+    for route in [""] + scrambles(50, 15) + scrambles(50, 14):
+        packed = packRoute(route)
+        assert len(packed) == (len(route) + 1) // 2
+        assert unpackRoute(packed, len(route)) == route
@@ -0,0 +1,36 @@
+import solver
+from batch import solve_many
+from rubik import Rubik
+
+'''
+solve_many: every kind of input, in order or as they are solved, in this process or over a pool
+'''
+SCRAMBLES = ["", "RUf", "DLB", "rfUUlbD", "FRuBd"]
+
+def inputs():
+    state = Rubik()
+    state.moves(SCRAMBLES[2])
+    other = Rubik()
+    other.moves(SCRAMBLES[3])
+    # A move string, a Rubik and a (cube, orie) pair
+    return [SCRAMBLES[0], SCRAMBLES[1], state, (other.cube, other.orie), SCRAMBLES[4]]
+
+def expected():
+    result = []
+    for route in SCRAMBLES:
+        state = Rubik()
+        state.moves(route)
+        result.append(len(solver.godSolve(state)[0].route))
+    return result
+
+def test_solveManyInProcess():
+    results = list(solve_many(inputs(), mode=3, workers=1))
+    assert [len(goal.route) for goal, _, _ in results] == expected()
+
+def test_solveManyPool():
+    lengths = expected()
+    results = list(solve_many(iter(inputs()), mode=3, workers=2, chunksize=1))
+    assert [len(goal.route) for goal, _, _ in results] == lengths
+    unordered = list(solve_many(inputs(), workers=2, search=solver.godSolve, ordered=False))
+    assert sorted(index for index, _ in unordered) == list(range(len(SCRAMBLES)))
+    assert all(len(result[0].route) == lengths[index] for index, result in unordered)
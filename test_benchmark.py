@@ -0,0 +1,44 @@
+import json
+
+from benchmark import CORPUS_PATH, CORPUS_VERSION, makeCorpus, diff, percentile, summary
+from test_coord import scrambled
+
+'''
+Benchmark (benchmark.py): the versioned corpus and the regression report
+'''
+with open(CORPUS_PATH) as f:
+    CORPUS = json.load(f)
+
+# The saved corpus is the one its seed makes
+def test_makeCorpus():
+    assert CORPUS['version'] == CORPUS_VERSION
+    assert makeCorpus(CORPUS['seed'], CORPUS['per_depth']) == CORPUS
+    assert sorted({case['depth'] for case in CORPUS['cases']}) == list(range(15))
+    for case in CORPUS['cases']:
+        assert len(case['scramble']) == case['depth']
+
+# The corpus scrambles are not all in the reduced cube, they test transformToStandard and translateMove
+def test_corpusHasFullMoves():
+    assert set(''.join(case['scramble'] for case in CORPUS['cases'])) == set("UuDdRrLlFfBb")
+    assert any(case['depth'] == 9 and scrambled(case['scramble']).cube[7] != 7 for case in CORPUS['cases'])
+
+def test_summary():
+    assert percentile([], 0.5) is None
+    assert percentile([3, 1, 2, 4], 0.5) == 3 and percentile([3, 1, 2, 4], 0.99) == 4
+    report = summary([0.5, 1.5], [100, 300], 1)
+    assert (report['solved'], report['timeouts'], report['nodes_per_sec']) == (2, 1, 200)
+
+def run(p50, nodesPerSec, solved = 10):
+    return {'configs': {'A_star': {'p50': p50, 'p95': p50, 'p99': p50, 'nodes_per_sec': nodesPerSec, 'solved': solved, 'timeouts': 0}}}
+
+def test_diff():
+    baseline = run(0.1, 1000)
+    assert diff(run(0.105, 980), baseline)['regressions'] == []
+    assert diff(run(0.2, 1000), baseline)['regressions'] == ['A_star p50', 'A_star p95', 'A_star p99']
+    assert diff(run(0.1, 500), baseline)['regressions'] == ['A_star nodes_per_sec']
+    assert diff(run(0.1, 1000, 9), baseline)['regressions'] == ['A_star solved']
+    # Faster is not a regression, and latencies under minSeconds are noise
+    assert diff(run(0.05, 2000), baseline)['regressions'] == []
+    assert diff(run(0.0008, 1000), run(0.0002, 1000))['regressions'] == []
+    report = diff(run(0.2, 1000), baseline)
+    assert report['configs']['A_star']['p50'] == {'before': 0.1, 'now': 0.2, 'change': 1.0}
@@ -0,0 +1,42 @@
+import json
+from time import time
+
+import pytest
+
+import solver
+from rubik import MOVES
+from budget import Budget, BudgetExceeded, residentMemory, PAGE_SIZE
+from benchmark import CORPUS_PATH
+from test_coord import scrambled
+
+'''
+Search budgets (budget.py): every engine stops with a BudgetExceeded when one is used up
+'''
+with open(CORPUS_PATH) as f:
+    DEEP = [case for case in json.load(f)['cases'] if case['depth'] == 14][0]
+
+ENGINES = ['A_star', 'IDA_star', 'biBFS', 'MA_star', 'layerBFS']
+BUDGETS = [('nodes', lambda: {'max_nodes': 1}), ('deadline', lambda: {'deadline': time() - 1}), ('memory', lambda: {'max_memory': 1})]
+
+@pytest.mark.parametrize('name', ENGINES)
+@pytest.mark.parametrize('reason, budget', BUDGETS)
+def test_budgetExceeded(name, reason, budget):
+    result = getattr(solver, name)(scrambled(DEEP['scramble']), 0, True, **budget())
+    assert isinstance(result, BudgetExceeded) and result.reason == reason
+    goal, generated, visited = result
+    assert goal is None and generated >= visited >= 1
+    assert 0 < result.lowerBound <= DEEP['depth']
+    assert result.best is None or all(c in MOVES for c in result.best.route)
+
+# Enough budget: the usual result
+@pytest.mark.parametrize('name', ENGINES)
+def test_budgetLeft(name):
+    goal, _, _ = getattr(solver, name)(scrambled("RUf"), 3, True, deadline=time() + 60, max_nodes=10**6, max_memory=2**40)
+    assert len(goal.route) == 3
+
+def test_budget():
+    assert Budget.of() is None
+    assert Budget(max_nodes=10).exceeded(9) is None and Budget(max_nodes=10).exceeded(10) == 'nodes'
+    assert Budget(deadline=time() + 60).exceeded(0) is None
+    assert residentMemory() > 0
+    assert PAGE_SIZE & (PAGE_SIZE - 1) == 0
@@ -0,0 +1,68 @@
+import solver
+from rubik import Rubik
+from cache import SolutionCache
+from symmetry import ALL_SYMS, conjugate
+from test_coord import scrambles, scrambled
+
+'''
+Solution cache (cache.py): hits, conjugates of cached states, LRU eviction and the dbm store
+'''
+def solves(state, route, transform):
+    state = state.copy()
+    state.moves(route)
+    if transform:
+        state.transformToStandard()
+    return state.isGoalState()
+
+def test_getPut():
+    cache = SolutionCache(100, symmetry=False)
+    state = scrambled("RUf")
+    assert cache.get(state.cube, state.orie) is None
+    cache.put(state.cube, state.orie, "FuR", transform=False)
+    assert cache.get(state.cube, state.orie, transform=False) == "FuR"
+    # Routes found with and without the transform are kept apart
+    assert cache.get(state.cube, state.orie, transform=True) is None
+    assert cache.stats() == {'size': 1, 'capacity': 100, 'hits': 1, 'misses': 2}
+
+# A route cached for one state is mapped to solve its 47 conjugates
+def test_conjugates():
+    for transform in (False, True):
+        cache = SolutionCache(1000)
+        for route in scrambles(3, 8):
+            state = scrambled(route)
+            cache.put(state.cube, state.orie, solver.A_star(state.copy(), 3, transform)[0].route, transform)
+            for sym in ALL_SYMS:
+                conj = Rubik(*conjugate(state.cube, state.orie, sym))
+                found = cache.get(conj.cube, conj.orie, transform)
+                assert found is not None and solves(conj, found, transform)
+
+def test_eviction():
+    cache = SolutionCache(3, symmetry=False)
+    states = [scrambled(route) for route in ("R", "U", "F", "D")]
+    for state in states[:3]:
+        cache.put(state.cube, state.orie, state.route.swapcase())
+    # Used last, kept
+    assert cache.get(states[0].cube, states[0].orie) == "r"
+    cache.put(states[3].cube, states[3].orie, "d")
+    assert len(cache) == 3
+    assert cache.get(states[1].cube, states[1].orie) is None
+    assert [cache.get(s.cube, s.orie) for s in (states[0], states[2], states[3])] == ["r", "f", "d"]
+
+def test_solve():
+    cache = SolutionCache(10)
+    state = scrambled("RUfDl")
+    goal, generated, _ = cache.solve(state.copy(), 3, False)
+    assert generated > 0 and solves(state, goal.route, False)
+    goal, generated, visited = cache.solve(state.copy(), 3, False)
+    assert (generated, visited) == (0, 0) and solves(state, goal.route, False)
+
+# Entries written to the dbm file are found by the next cache on that file
+def test_store(tmp_path):
+    filename = str(tmp_path / 'cache')
+    cache = SolutionCache(10, filename)
+    state = scrambled("RUf")
+    cache.put(state.cube, state.orie, "FuR", transform=False)
+    cache.close()
+    cache = SolutionCache(10, filename)
+    assert cache.get(state.cube, state.orie, transform=False) == "FuR"
+    cache.close()
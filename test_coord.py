@@ -0,0 +1,63 @@
+import random
+
+import coord
+from rubik import Rubik, MOVES
+
+'''
+Encoded states (coord.py): ranks, move tables and CoordRubik against the list based Rubik
+'''
+# Random scrambles, the same on every run
+def scrambles(n, length, moves = MOVES, seed = 0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(moves) for _ in range(length)) for _ in range(n)]
+
+def scrambled(route):
+    state = Rubik()
+    state.moves(route)
+    return state
+
+def test_encodeDecode():
+    assert coord.encode(Rubik().cube, Rubik().orie) == 0
+    for route in scrambles(200, 20):
+        state = scrambled(route)
+        index = coord.encode(state.cube, state.orie)
+        assert 0 <= index < coord.N_STATES
+        assert coord.decode(index) == (state.cube, state.orie)
+
+def test_encodeDecodeReduced():
+    for route in scrambles(200, 20, coord.REDUCED_MOVES):
+        state = scrambled(route)
+        index = coord.encodeReduced(state.cube, state.orie)
+        assert 0 <= index < coord.N_STATES7
+        assert coord.decodeReduced(index) == (state.cube, state.orie)
+
+# The move tables do what Rubik.moves does, for every move
+def test_moveTables():
+    for route in scrambles(50, 20):
+        state = scrambled(route)
+        index = coord.encode(state.cube, state.orie)
+        for m, move in enumerate(MOVES):
+            child = scrambled(route + move)
+            assert coord.applyMove(index, m) == coord.encode(child.cube, child.orie)
+
+def test_reducedMoveTables():
+    for route in scrambles(50, 20, coord.REDUCED_MOVES):
+        state = scrambled(route)
+        index = coord.encodeReduced(state.cube, state.orie)
+        for m, move in enumerate(coord.REDUCED_MOVES):
+            child = scrambled(route + move)
+            assert coord.applyReducedMove(index, m) == coord.encodeReduced(child.cube, child.orie)
+
+# The tables saved in permMove.bin ... are the ones buildTables makes
+def test_loadedTables():
+    _, _, permMove, orieMove = coord.buildTables(7, coord.REDUCED_MOVES)
+    assert [list(t) for t in permMove] == [list(t) for t in coord.PERM_MOVE7]
+    assert [list(t) for t in orieMove] == [list(t) for t in coord.ORIE_MOVE7]
+
+def test_coordRubik():
+    for route in scrambles(20, 20):
+        state = coord.CoordRubik()
+        state.moves(route)
+        expected = scrambled(route)
+        assert (state.cube, state.orie) == (expected.cube, expected.orie)
+        assert coord.CoordRubik.fromRubik(expected).state == state.state
@@ -0,0 +1,52 @@
+import json
+import random
+from os import listdir
+
+import solver
+from rubik import Rubik, MOVES
+from coord import encodeReduced, N_STATES7
+from godtable import GodTable
+from benchmark import CORPUS_PATH
+
+'''
+God's table: optimal routes of every corpus state, building the table on first use
+'''
+def scrambled(route):
+    state = Rubik()
+    state.moves(route)
+    return state
+
+def test_godSolveCorpus():
+    with open(CORPUS_PATH) as f:
+        cases = json.load(f)['cases']
+    for case in cases:
+        goal, _, _ = solver.godSolve(scrambled(case['scramble']))
+        assert len(goal.route) == case['depth']
+        end = scrambled(case['scramble'] + goal.route)
+        end.transformToStandard()
+        assert end.isGoalState()
+
+# Optimal on random full-move scrambles too: as long as the route of A_star with an admissible heuristic
+def test_godSolveRandom():
+    rng = random.Random(0)
+    for _ in range(10):
+        route = ''.join(rng.choice(MOVES) for _ in range(8))
+        assert len(solver.godSolve(scrambled(route))[0].route) == len(solver.A_star(scrambled(route), 3)[0].route)
+
+# A missing file is built, saved in one step (no temporary file left) and then read like the shipped one
+def test_buildOnFirstUse(tmp_path):
+    filename = str(tmp_path / 'godTable.bin')
+    table = GodTable(filename)
+    assert listdir(tmp_path) == ['godTable.bin']
+    assert table.db is not None
+    shared = solver.getGodTable()
+    for index in random.Random(1).sample(range(N_STATES7), 1000):
+        assert table.distance(index) == shared.distance(index)
+
+# Nowhere to save it: the table is kept in memory
+def test_buildNotWritable(tmp_path):
+    table = GodTable(str(tmp_path / 'missing' / 'godTable.bin'))
+    assert table.db is None
+    state = scrambled("RUfRRuF")
+    route, _ = table.route(encodeReduced(state.cube, state.orie))
+    assert route == solver.getGodTable().route(encodeReduced(state.cube, state.orie))[0]
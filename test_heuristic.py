@@ -0,0 +1,67 @@
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from rubik import Rubik, Node, MOVES
+from coord import PERMS, ORIES, N_PERM, N_ORIE
+from heuristic import HEURISTICS, evaluator
+from test_coord import scrambles, scrambled
+
+'''
+Heuristic evaluators (heuristic.py): shared per mode, picklable, coord() and child() agree with raw()
+'''
+MODES = range(len(HEURISTICS))
+
+@pytest.mark.parametrize('mode', MODES)
+def test_evaluator(mode):
+    h = evaluator(mode)
+    assert evaluator(mode) is h and evaluator(h) is h and h.mode == mode
+    # Shared, not copied: pickled as its mode, unpickled as the evaluator of this process
+    assert pickle.loads(pickle.dumps(h)) is h and deepcopy(h) is h
+    assert h(Rubik().cube, Rubik().orie) == 0
+
+# A state keeps its value for the evaluator that computed it and still pickles
+@pytest.mark.parametrize('mode', MODES)
+def test_estimate(mode):
+    state = scrambled("RUfDl")
+    value = state.estimate(mode)
+    assert value == evaluator(mode)(state.cube, state.orie)
+    assert state.getHeuristic(mode) == value + len(state.route)
+    copy = pickle.loads(pickle.dumps(state))
+    assert (copy.cube, copy.orie, copy.route) == (state.cube, state.orie, state.route)
+    assert copy.estimate(mode) == value
+
+def test_estimateOtherEvaluator():
+    state = scrambled("RUfDl")
+    values = [state.estimate(mode) for mode in MODES]
+    assert values == [evaluator(mode)(state.cube, state.orie) for mode in MODES]
+    assert len(set(values)) > 1
+
+@pytest.mark.parametrize('mode', MODES)
+def test_coord(mode):
+    h = evaluator(mode)
+    for i in range(0, N_PERM * N_ORIE, 7919 * 13):
+        p, o = divmod(i, N_ORIE)
+        assert h.coord(p, o) == h.raw(PERMS[p], ORIES[o]) / h.scale
+
+# The raw of a child from its parent's raw is the raw of the child
+@pytest.mark.parametrize('mode', [mode for mode in MODES if evaluator(mode).incremental])
+def test_child(mode):
+    h = evaluator(mode)
+    for route in scrambles(100, 15):
+        state = scrambled(route)
+        raw = h.raw(state.cube, state.orie)
+        for m, move in enumerate(MOVES):
+            child = scrambled(route + move)
+            assert h.child(raw, state.cube, state.orie, m) == h.raw(child.cube, child.orie)
+
+def test_incremental():
+    assert [mode for mode in MODES if evaluator(mode).incremental] == [0, 1]
+    # A Node carries the raw down the moves
+    h = evaluator(1)
+    node = Node()
+    node.estimate(h)
+    for move in "RUfDlbR":
+        node = node.move(move, h)
+        assert node.heuristic == h.raw(node.cube, node.orie)
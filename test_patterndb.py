@@ -0,0 +1,85 @@
+from os import path
+
+import pytest
+
+from rubik import PAIR_CUBES
+from patterndb import PatternDB, DATA_DIR, save, buildCubiesTable, SCHEME_CUBIES, SCHEME_REDUCED, SCHEME_MOVE
+
+'''
+Binary pattern databases (patterndb.py): format round trips and the shipped tables
+'''
+@pytest.mark.parametrize('bits, values', [(4, [0, 15, 3, 7, 1]), (8, [0, 255, 17, 3]), (16, [0, 65535, 258, 40319])])
+def test_saveLoad(tmp_path, bits, values):
+    filename = str(tmp_path / 'table.bin')
+    save(filename, SCHEME_REDUCED, values, bits=bits)
+    db = PatternDB(filename)
+    assert (db.scheme, db.bits, db.subsets) == (SCHEME_REDUCED, bits, [()])
+    assert [db.get(i) for i in range(len(values))] == values
+
+def test_saveSubsets(tmp_path):
+    filename = str(tmp_path / 'tables.bin')
+    subsets = [(0, 1), (2, 3), (4, 5)]
+    save(filename, SCHEME_CUBIES, bytes(range(12)), subsets)
+    db = PatternDB(filename)
+    assert db.subsets == subsets and db.entries == 4
+    assert bytes(db.table) == bytes(range(12))
+
+def test_arrays(tmp_path):
+    filename = str(tmp_path / 'moves.bin')
+    save(filename, SCHEME_MOVE, [1, 2, 3, 40000, 5, 6], [(0,), (1,)], bits=16)
+    assert [list(table) for table in PatternDB(filename).arrays()] == [[1, 2, 3], [40000, 5, 6]]
+
+def test_notAPatternDB(tmp_path):
+    filename = tmp_path / 'other.bin'
+    filename.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        PatternDB(str(filename))
+
+# Importing loads no table, the first solve loads its own, from any working directory
+def test_lazyLoading(tmp_path):
+    import subprocess
+    import sys
+    from os import environ
+    script = "import rubik, solver; " \
+        "assert (rubik.DB, rubik.DB2, rubik.DB3) == (None, None, None); " \
+        "state = rubik.Rubik(); state.moves('RUf'); " \
+        "assert len(solver.A_star(state, 1, False)[0].route) == 3; " \
+        "assert rubik.DB is not None and (rubik.DB2, rubik.DB3) == (None, None)"
+    env = dict(environ, PYTHONPATH=path.dirname(path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), env=env, check=True)
+
+# The shipped tables are the ones the retrograde builder makes
+@pytest.mark.parametrize('filename, subsets', [('db.bin', [(cubie,) for cubie in range(8)]), ('dbPair.bin', PAIR_CUBES)])
+def test_buildCubiesTable(filename, subsets):
+    db = PatternDB(path.join(DATA_DIR, filename))
+    assert db.subsets == [tuple(subset) for subset in subsets]
+    assert bytes(db.table[:db.entries * len(subsets)]) == b''.join(buildCubiesTable(subset) for subset in subsets)
+
+# Orientation only and permutation only tables: the shipped ones are the ones buildCoordTable makes
+def test_buildCoordTable():
+    import coord
+    from patterndb import buildCoordTable, COORD_DBS
+    tables = {
+        'orie': (coord.N_ORIE, coord.ORIE_MOVE),
+        'perm': (coord.N_PERM, coord.PERM_MOVE),
+        'orie7': (coord.N_ORIE7, coord.ORIE_MOVE7),
+        'perm7': (coord.N_PERM7, coord.PERM_MOVE7),
+    }
+    for name, (filename, scheme, k) in COORD_DBS.items():
+        db = PatternDB(path.join(DATA_DIR, filename))
+        assert (db.scheme, db.subsets) == (scheme, [tuple(range(k))])
+        assert bytes(db.table[:db.entries]) == bytes(buildCoordTable(*tables[name]))
+
+# The max of the two tables never overestimates the optimal depth
+def test_coordDBAdmissible():
+    import json
+    from benchmark import CORPUS_PATH
+    from heuristic import evaluator
+    from rubik import Rubik
+    with open(CORPUS_PATH) as f:
+        cases = json.load(f)['cases']
+    h = evaluator(3)
+    for case in cases:
+        state = Rubik()
+        state.moves(case['scramble'])
+        assert h(state.cube, state.orie) <= case['depth']
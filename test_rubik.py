@@ -0,0 +1,53 @@
+import solver
+from rubik import Rubik, Node, MOVES, DLB, translateMove
+from test_coord import scrambles, scrambled
+
+'''
+Slotted states (Rubik, Node) and the whole cube reorientation (Rubik.transformToStandard) against the
+breadth-first search it replaces
+'''
+def test_slots():
+    for state in (Rubik(), Node()):
+        assert not hasattr(state, '__dict__')
+
+# A Node does what a Rubik does, without changing itself
+def test_node():
+    for route in scrambles(50, 12):
+        state = scrambled(route)
+        node = Node().moves(route)
+        assert (list(node.cube), list(node.orie), node.route) == (state.cube, state.orie, state.route)
+        assert node == Node.fromRubik(state) and hash(node) == hash(Node.fromRubik(state))
+        back = node.toRubik()
+        assert (back.cube, back.orie, back.route) == (state.cube, state.orie, state.route)
+        child = node.move(MOVES[0])
+        assert child != node and node.route == state.route
+    assert Node().isGoalState() and not Node().move('R').isGoalState()
+
+FOLLOW = {'U':'d', 'u':'D', 'D':'u', 'd':'U', 'F':'b', 'f':'B', 'B':'f', 'b':'F', 'R':'l', 'r':'L', 'L':'r', 'l':'R'}
+
+def test_transformToStandard():
+    placements = set()
+    for route in scrambles(300, 15):
+        state = scrambled(route)
+        pos = state.cube.index(DLB)
+        placements.add((pos, state.orie[pos]))
+        standard = state.copy()
+        transform = standard.transformToStandard()
+        assert transform == state.searchRouteToStandard()
+        assert standard.cube[7] == DLB and standard.orie[7] == 0
+        # The same as turning the two layers of each move of the route
+        turned = state.copy()
+        turned.moves(''.join(move + FOLLOW[move] for move in transform))
+        assert (standard.cube, standard.orie, standard.route) == (turned.cube, turned.orie, turned.route)
+    assert len(placements) == 24
+
+# A route found after the transform, translated, solves the state before it up to a turn of the whole cube
+def test_translateMove():
+    for route in scrambles(10, 8):
+        state = scrambled(route)
+        standard = state.copy()
+        transform = standard.transformToStandard()
+        solution = solver.A_star(standard, 3, False)[0].route
+        state.moves(translateMove(transform, solution))
+        state.transformToStandard()
+        assert state.isGoalState()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from rubik import Rubik
+from server import SolveService, MAX_BODY
+from cache import SolutionCache
+
+'''
+Solve service (server.py): requests parsed from raw bytes, validation errors, shared and cached solves
+'''
+@pytest.fixture
+def service():
+    service = SolveService(workers=1, cache=SolutionCache(10))
+    yield service
+    service.close()
+
+def post(body, length = None):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return b"POST /solve HTTP/1.1\r\nContent-Length: %s\r\n\r\n%s" % (str(len(data) if length is None else length).encode(), data)
+
+# (status, answer) of each request, all read at once
+def requests(service, *raws):
+    async def run():
+        async def one(raw):
+            reader = asyncio.StreamReader()
+            reader.feed_data(raw)
+            reader.feed_eof()
+            return await service.route(reader)
+        return await asyncio.gather(*[one(raw) for raw in raws])
+    return asyncio.run(run())
+
+@pytest.mark.parametrize('raw', [
+    post({'moves': "RU", 'mode': True}),
+    post({'moves': "RU", 'mode': 1.0}),
+    post({'moves': "RU", 'mode': 4}),
+    post({'moves': "RU", 'transform': "false"}),
+    post({'moves': "RU", 'search': "BFS"}),
+    post({'moves': "RUx"}),
+    post({'moves': ["R"]}),
+    post({'colors': [["w", "o", "g"]] * 7 + [["y", "g", 1]]}),
+    post({'colors': [["w", "o", "g"]] * 8}),
+    post({}),
+    post([{'moves': "RU"}]),
+    post(b"{moves"),
+    post({'moves': "RU"}, length="12a"),
+    post({'moves': "RU"}, length=-1),
+    post({'moves': "RU"}, length=MAX_BODY + 1),
+    post({'moves': "RU"}, length=100),
+    b"POST /solve\r\n\r\n",
+])
+def test_badRequest(service, raw):
+    [(status, answer)] = requests(service, raw)
+    assert status == 400 and answer['error']
+
+def test_notFound(service):
+    assert [status for status, _ in requests(service, b"GET /solve HTTP/1.1\r\n\r\n", b"POST /metrics HTTP/1.1\r\n\r\n",
+        b"GET /other HTTP/1.1\r\n\r\n")] == [405, 405, 404]
+
+# The same state at the same time is one search, then it is in the cache
+def test_solve(service):
+    (status, first), (_, second) = requests(service, post({'moves': "RUf", 'transform': False}), post({'moves': "RUf", 'transform': False}))
+    assert status == 200 and first['route'] == second['route'] and len(first['route']) == 3
+    assert sorted([first['shared'], second['shared']]) == [False, True]
+    state = Rubik()
+    state.moves("RUf" + first['route'])
+    assert state.isGoalState()
+    [(status, cached)] = requests(service, post({'moves': "RUf", 'transform': False}))
+    assert cached['cached'] and cached['route'] == first['route'] and cached['generated'] == 0
+    [(status, metrics)] = requests(service, b"GET /metrics HTTP/1.1\r\n\r\n")
+    assert status == 200 and metrics['requests'] == 3 and metrics['shared'] == 1 and metrics['inflight'] == 0
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+import solver
+from rubik import Rubik
+from benchmark import CORPUS_PATH
+from budget import BudgetExceeded
+
+'''
+Route length of every search engine against the optimal depth of the benchmark corpus (full-move scrambles,
+the DLB cubie anywhere), with and without transformToStandard. Kept cheap: a few seconds in all.
+
+    python -m pytest -q
+'''
+def scrambled(route):
+    state = Rubik()
+    state.moves(route)
+    return state
+
+with open(CORPUS_PATH) as f:
+    CORPUS = json.load(f)['cases']
+
+# A few corpus cases of each depth (optimal depth in quarter turns)
+def corpusCases(depths, perDepth = 2):
+    return [case for depth in depths for case in [c for c in CORPUS if c['depth'] == depth][:perDepth]]
+
+# Final result of ARA_star, the optimal route
+def lastResult(search):
+    result = None
+    for result in search:
+        pass
+    return result
+
+# name: search(state, transform), mode 3 is admissible so every engine finds an optimal route
+ENGINES = {
+    'A_star': lambda state, transform: solver.A_star(state, 3, transform),
+    'BFS': lambda state, transform: solver.A_star(state, 0, transform, solver.FifoList),
+    'IDA_star': lambda state, transform: solver.IDA_star(state, 3, transform),
+    'biBFS': lambda state, transform: solver.biBFS(state, 3, transform),
+    'A_star/symmetry': lambda state, transform: solver.A_star(state, 3, transform, symmetry=True),
+    'layerBFS': lambda state, transform: solver.layerBFS(state, 3, transform),
+    'ARA_star': lambda state, transform: lastResult(solver.ARA_star(state, 3, transform)),
+    'MA_star': lambda state, transform: solver.MA_star(state, 3, transform, max_states=2000),
+}
+# BFS is slow on deep states
+SHALLOW = {'BFS'}
+# Without the transform layerBFS needs the 88 MB table of the whole cube
+TRANSFORM_ONLY = {'layerBFS'}
+
+def engineCases():
+    cases = []
+    for name in ENGINES:
+        cases += [(name, True, case) for case in corpusCases((0, 3, 6) if name in SHALLOW else (0, 3, 6, 9))]
+        if name not in TRANSFORM_ONLY:
+            cases += [(name, False, case) for case in corpusCases((1, 4) if name in SHALLOW else (1, 4, 7), 1)]
+    return cases
+
+@pytest.mark.parametrize('name, transform, case', engineCases())
+def test_engineRouteLength(name, transform, case):
+    goal = ENGINES[name](scrambled(case['scramble']), transform)[0]
+    assert len(goal.route) == case['depth']
+    # Solved, up to a turn of the whole cube after transformToStandard
+    end = scrambled(case['scramble'] + goal.route)
+    if transform:
+        end.transformToStandard()
+    assert end.isGoalState()
+
+# Lowest f first, then the deeper node, then the first pushed
+def test_openList():
+    queue = solver.OpenList()
+    for node, f, g in [('a', 5, 1), ('b', 4, 1), ('c', 5, 3), ('d', 4, 1), ('e', 6, 0)]:
+        queue.put(node, f, g)
+    assert len(queue) == 5 and queue.lowerBound() == 4
+    assert [queue.get() for _ in range(5)] == [('b', 1), ('d', 1), ('c', 3), ('a', 1), ('e', 0)]
+    assert queue.empty() and queue.lowerBound() == 0
+
+def test_fifoList():
+    queue = solver.FifoList()
+    for node, f, g in [('a', 5, 1), ('b', 4, 2)]:
+        queue.put(node, f, g)
+    assert queue.lowerBound() == 1
+    assert [queue.get(), queue.get()] == [('a', 1), ('b', 2)]
+    assert queue.empty()
+
+# Every route of ARA_star is shorter than the bound times the optimal depth, the last one is optimal
+def test_araStarBounds():
+    case = corpusCases((14,), 1)[0]
+    results = list(solver.ARA_star(scrambled(case['scramble']), 3, True))
+    bounds = [bound for _, _, _, bound in results]
+    assert bounds == sorted(bounds, reverse=True) and bounds[-1] == 1
+    for goal, _, _, bound in results:
+        assert case['depth'] <= len(goal.route) <= bound * case['depth']
+    assert len(results[-1][0].route) == case['depth']
+
+# Out of budget: the last item is a BudgetExceeded with the best route found so far, if any
+def test_araStarBudget():
+    case = corpusCases((14,), 1)[0]
+    stopped = lastResult(solver.ARA_star(scrambled(case['scramble']), 3, True, max_nodes=1))
+    assert isinstance(stopped, BudgetExceeded) and stopped.reason == 'nodes' and stopped.best is None
+    assert stopped.generated >= 1 and 0 < stopped.lowerBound <= case['depth']
+    results = list(solver.ARA_star(scrambled(case['scramble']), 3, True, max_nodes=20000))
+    stopped = results[-1]
+    assert isinstance(stopped, BudgetExceeded) and len(results) > 1
+    assert stopped.best.route == results[-2][0].route and stopped.lowerBound <= case['depth']
+    end = scrambled(case['scramble'] + stopped.best.route)
+    end.transformToStandard()
+    assert end.isGoalState()
+
+# Still optimal with a memory limit far under what A_star needs, and keeps at most max_states states
+@pytest.mark.parametrize('limit', [{'max_states': 100}, {'max_bytes': 200000}])
+def test_maStarLimit(limit):
+    maxStates = limit.get('max_states', limit.get('max_bytes', 0) // solver.TABLE_ENTRY_BYTES)
+    for case in corpusCases((8, 11), 1):
+        stats = solver.MA_star(scrambled(case['scramble']), 3, True, **limit)
+        assert len(stats.goal.route) == case['depth'] and stats.visitedPeak <= maxStates
+        end = scrambled(case['scramble'] + stats.goal.route)
+        end.transformToStandard()
+        assert end.isGoalState()
@@ -0,0 +1,48 @@
+import json
+import pickle
+
+import pytest
+
+import solver
+from stats import SearchStats
+from test_coord import scrambled
+
+'''
+Search statistics (stats.py): counters of A_star, hooks, and the old tuple interface
+'''
+@pytest.mark.parametrize('mode', range(4))
+@pytest.mark.parametrize('transform', [True, False])
+def test_counters(mode, transform):
+    stats = solver.A_star(scrambled("RUfDlbR"), mode, transform, timing=True)
+    assert isinstance(stats, SearchStats) and stats.goal is not None
+    # Every child is either dropped or pushed with its heuristic value
+    assert stats.generated == stats.duplicates + stats.heuristicEvaluations
+    assert 1 <= stats.expanded <= stats.visited <= stats.visitedPeak <= stats.heuristicEvaluations + 1
+    assert stats.openPeak <= stats.heuristicEvaluations + 1
+    assert 0 <= stats.heuristicTime <= stats.wallTime and stats.expansionTime == stats.wallTime - stats.heuristicTime
+
+def test_solved():
+    stats = solver.A_star(scrambled(""), 3, True)
+    assert stats.goal.route == "" and (stats.expanded, stats.generated) == (0, 0)
+    assert stats.heuristicTime is None and stats.expansionTime is None
+
+@pytest.mark.parametrize('every', [1, 10])
+def test_hook(every):
+    calls = []
+    stats = solver.A_star(scrambled("RUfDlbR"), 1, True, hook=lambda s: calls.append(s.expanded), every=every)
+    assert calls and all(expanded % every == 0 for expanded in calls)
+    # Not after the expansion that finds the goal, the search returns there
+    assert calls == sorted(calls) and len(calls) == (stats.expanded - 1) // every
+
+def test_tuple():
+    stats = solver.A_star(scrambled("RUf"), 3, True)
+    goal, generated, visited = stats
+    assert (stats[0], stats[1], stats[2]) == (goal, generated, visited) == (stats.goal, stats.generated, stats.visited)
+    assert len(stats) == 3 and len(goal.route) == 3
+
+# Pickled without the hook (it may be a lambda), as a dict for JSON
+def test_pickle():
+    stats = solver.A_star(scrambled("RUf"), 3, True, hook=lambda s: None)
+    copy = pickle.loads(pickle.dumps(stats))
+    assert copy.hook is None and copy.asDict() == stats.asDict()
+    assert json.loads(json.dumps(stats.asDict()))['route'] == stats.goal.route
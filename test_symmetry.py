@@ -0,0 +1,50 @@
+import pytest
+
+import solver
+from rubik import Rubik, MOVES
+from coord import encode
+from symmetry import ALL_SYMS, STANDARD_SYMS, MOVE_MAP, canonical, canonicalIndexer, conjugate, mapRoute, mapRouteBack
+from test_coord import scrambles, scrambled
+
+'''
+Symmetries of the cube (symmetry.py): canonical keys, conjugate depths and route mapping
+'''
+def test_symmetries():
+    assert len(ALL_SYMS) == 48 and len(STANDARD_SYMS) == 6
+    for moveMap in MOVE_MAP:
+        assert sorted(moveMap) == list(range(len(MOVES)))
+    assert MOVE_MAP[0] == list(range(len(MOVES)))
+
+# The table driven key is the smallest key of all conjugates, as canonical computes it
+@pytest.mark.parametrize('syms, moves', [(ALL_SYMS, MOVES), (STANDARD_SYMS, "UuFfRr")])
+def test_canonicalIndexer(syms, moves):
+    canonicalIndex = canonicalIndexer(syms)
+    for route in scrambles(100, 20, moves):
+        state = scrambled(route)
+        index, cube, orie, sym = canonical(state.cube, state.orie, syms)
+        assert (cube, orie) == conjugate(state.cube, state.orie, sym)
+        assert encode(cube, orie) == index
+        assert canonicalIndex(encode(state.cube, state.orie)) == index
+        # The same key for every state of the class
+        other = conjugate(state.cube, state.orie, syms[-1])
+        assert canonicalIndex(encode(*other)) == index
+
+# A conjugate is as far from the goal as the state
+def test_conjugateDepth():
+    for route in scrambles(10, 12):
+        state = scrambled(route)
+        depth = len(solver.godSolve(state.copy())[0].route)
+        for sym in ALL_SYMS:
+            assert len(solver.godSolve(Rubik(*conjugate(state.cube, state.orie, sym)))[0].route) == depth
+
+# A route of the state solves the conjugate once mapped, and back
+def test_mapRoute():
+    for route in scrambles(5, 8):
+        state = scrambled(route)
+        solution = solver.A_star(state.copy(), 3, False)[0].route
+        for sym in ALL_SYMS:
+            conj = Rubik(*conjugate(state.cube, state.orie, sym))
+            mapped = mapRoute(sym, solution)
+            assert mapRouteBack(sym, mapped) == solution
+            conj.moves(mapped)
+            assert conj.isGoalState()
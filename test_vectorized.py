@@ -0,0 +1,50 @@
+import numpy as np
+
+import vectorized
+from rubik import Rubik, MOVES
+from test_coord import scrambles, scrambled
+
+'''
+Batched states (vectorized.py): moves on whole arrays against Rubik.moves
+'''
+def test_toArray():
+    states = [scrambled(route) for route in scrambles(20, 15)]
+    rows = vectorized.toArray(states)
+    assert rows.shape == (20, 16) and rows.dtype == np.uint8
+    assert [(s.cube, s.orie) for s in vectorized.toRubiks(rows)] == [(s.cube, s.orie) for s in states]
+    assert (vectorized.goals(3) == vectorized.toArray([Rubik()] * 3)).all()
+
+def test_applyMove():
+    routes = scrambles(100, 15)
+    states = vectorized.toArray([scrambled(route) for route in routes])
+    for m, move in enumerate(MOVES):
+        children = [scrambled(route + move) for route in routes]
+        assert (vectorized.applyMove(states, m) == vectorized.toArray(children)).all()
+        assert (vectorized.applyMove(states, move) == vectorized.toArray(children)).all()
+    # One move per row
+    ms = np.arange(len(routes)) % len(MOVES)
+    children = [scrambled(route + MOVES[m]) for route, m in zip(routes, ms)]
+    assert (vectorized.applyMove(states, ms) == vectorized.toArray(children)).all()
+
+def test_applyRoute():
+    routes = scrambles(20, 10)
+    states = vectorized.toArray([scrambled(route) for route in routes])
+    for route in scrambles(5, 12, seed=1):
+        children = [scrambled(r + route) for r in routes]
+        assert (vectorized.applyRoute(states, route + " ") == vectorized.toArray(children)).all()
+        inverse = route[::-1].swapcase()
+        assert (vectorized.applyRoute(vectorized.applyRoute(states, route), inverse) == states).all()
+
+def test_scramble():
+    states, moves = vectorized.scramble(50, 8, seed=0)
+    for row, ms in zip(states, moves):
+        assert (row == vectorized.toArray([scrambled(''.join(MOVES[m] for m in ms))])[0]).all()
+    assert vectorized.isGoal(vectorized.goals(2)).all()
+    assert vectorized.isGoal(vectorized.applyRoute(vectorized.goals(2), "Rr")).all()
+    assert not vectorized.isGoal(vectorized.applyRoute(vectorized.goals(2), "R")).any()
+
+# Number of states at each depth of the reduced cube (quarter turns)
+def test_depthCounts():
+    counts = vectorized.depthCounts(0, "UuFfRr", reduced=True)
+    assert counts == [1, 6, 27, 120, 534, 2256, 8969, 33058, 114149, 360508, 930588, 1350852, 782536, 90280, 276]
+    assert sum(counts) == len(vectorized.distances(0, "UuFfRr", reduced=True))
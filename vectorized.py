@@ -0,0 +1,168 @@
+import numpy as np
+from rubik import Rubik, MOVES, MOVE_INDEX, SOURCE, TWIST, GOAL_POSITION, GOAL_ORIENTATION
+
+'''
+Many states at once as NumPy arrays
+
+A batch of states is an (N, 16) uint8 array, one row per state: cube[0..7] then orie[0..7].
+A move is one fancy-indexing gather of every row plus an orientation delta, with the same semantics as
+Rubik.U() ... Rubik.b(): cube[p] = old cube[SOURCE[m][p]], orie[p] = (old orie[SOURCE[m][p]] + TWIST[m][p]) % 3
+'''
+GOAL_ROW = np.array(GOAL_POSITION + GOAL_ORIENTATION, dtype=np.uint8)
+
+# GATHER[m]: columns of the old row that make the new row, DELTA[m]: what to add to each column (0 for cube[])
+GATHER = np.array([list(src) + [s + 8 for s in src] for src in SOURCE], dtype=np.intp)
+DELTA = np.array([[0] * 8 + list(twist) for twist in TWIST], dtype=np.uint8)
+# (orie + delta) % 3 without a division: MOD3[orie + delta], only the orientation columns go through it
+MOD3 = np.array([0, 1, 2, 0, 1], dtype=np.uint8)
+
+def toArray(states):
+    return np.array([list(s.cube) + list(s.orie) for s in states], dtype=np.uint8).reshape(-1, 16)
+
+def toRubiks(states, cls = Rubik):
+    return [cls(row[:8].tolist(), row[8:].tolist()) for row in states]
+
+def goals(n):
+    return np.tile(GOAL_ROW, (n, 1))
+
+def moveIndex(m):
+    return MOVE_INDEX[m] if isinstance(m, str) else m
+
+# Apply a move to every row: m is a move ("U", ...) or an index into MOVES, the same for all rows,
+# or an array of N indexes into MOVES, one move per row
+def applyMove(states, m):
+    if np.ndim(m) == 0:
+        m = moveIndex(m)
+        cols = states[:, GATHER[m]]
+        cols[:, 8:] = MOD3[cols[:, 8:] + DELTA[m, 8:]]
+        return cols
+    m = np.asarray(m, dtype=np.intp)
+    cols = np.take_along_axis(states, GATHER[m], axis=1)
+    cols[:, 8:] = MOD3[cols[:, 8:] + DELTA[m, 8:]]
+    return cols
+
+# Apply the same route (move string) to every row, characters that are not moves are skipped like Rubik.moves()
+def applyRoute(states, route):
+    for c in route:
+        if c in MOVE_INDEX:
+            states = applyMove(states, MOVE_INDEX[c])
+    return states
+
+# n random scrambles of length moves each from the goal, also return the (n, length) move indexes used
+def scramble(n, length, seed = None):
+    rng = np.random.default_rng(seed)
+    moves = rng.integers(0, len(MOVES), size=(n, length))
+    states = goals(n)
+    for i in range(length):
+        states = applyMove(states, moves[:, i])
+    return states, moves
+
+def isGoal(states):
+    return (states == GOAL_ROW).all(axis=1)
+
+'''
+Level-synchronous breadth-first search over encoded states (coord.py)
+
+A whole depth layer is one sorted array of state indexes. Expanding it is one table lookup per move for
+every state of the layer. Duplicates are removed with one byte per state of the encoding, the distance
+from the start (UNKNOWN if not reached yet): the children not reached yet get depth + 1, then the next
+layer is every state at depth + 1 (np.unique of the children instead if there are only a few of them).
+Memory: 1 byte per state of the encoding (3.7 MB reduced, 88 MB full) plus the last layer.
+'''
+UNKNOWN = 255
+_tables = {}
+
+# (orientation count, permutation move table, orientation move table, move names) of an encoding, as NumPy arrays
+# Full: coord.encode with the moves of rubik.MOVES, reduced: coord.encodeReduced with coord.REDUCED_MOVES
+def moveTables(reduced = False):
+    if reduced not in _tables:
+        import coord
+        if reduced:
+            _tables[reduced] = (coord.N_ORIE7, np.array(coord.PERM_MOVE7, dtype=np.uint32),
+                np.array(coord.ORIE_MOVE7, dtype=np.uint32), coord.REDUCED_MOVES)
+        else:
+            _tables[reduced] = (coord.N_ORIE, np.array(coord.PERM_MOVE, dtype=np.uint32),
+                np.array(coord.ORIE_MOVE, dtype=np.uint32), MOVES)
+    return _tables[reduced]
+
+# Every state of x after every move of the move indexes ms, shape (len(ms), len(x))
+def expand(x, ms, reduced = False):
+    nOrie, permMove, orieMove, _ = moveTables(reduced)
+    p, o = np.divmod(x, nOrie)
+    return permMove[ms][:, p] * nOrie + orieMove[ms][:, o]
+
+# Yield (depth, sorted array of the states at that depth, distance array) from start
+# until every state reachable with moves is done
+def bfs(start = 0, moves = None, reduced = False):
+    nOrie, permMove, _, names = moveTables(reduced)
+    ms = np.array([names.index(c) for c in (moves or names)], dtype=np.intp)
+    dist = np.full(permMove.shape[1] * nOrie, UNKNOWN, dtype=np.uint8)
+    dist[start] = 0
+    layer = np.array([start], dtype=np.uint32)
+    depth = 0
+    while len(layer):
+        yield depth, layer, dist
+        depth += 1
+        children = expand(layer, ms, reduced).ravel()
+        children = children[dist[children] == UNKNOWN]
+        dist[children] = depth
+        if len(children) * 64 < len(dist):
+            layer = np.unique(children)
+        else:
+            layer = np.flatnonzero(dist == depth).astype(np.uint32)
+
+def layers(start = 0, moves = None, reduced = False):
+    for depth, layer, _ in bfs(start, moves, reduced):
+        yield depth, layer
+
+# Distance from start (the goal by default) of every state, UNKNOWN if it is not reachable
+def distances(start = 0, moves = None, reduced = False):
+    for _, _, dist in bfs(start, moves, reduced):
+        pass
+    return dist
+
+# Number of states at each depth
+def depthCounts(start = 0, moves = None, reduced = False):
+    return [len(layer) for _, layer in layers(start, moves, reduced)]
+
+# Mask of the states (coord.encode) that have every cubie of indexes at its place, like Rubik.isCorrectPositionCube
+def correctPosition(states, indexes):
+    if 'decode' not in _tables:
+        import coord
+        _tables['decode'] = np.array(coord.PERMS, dtype=np.uint8), np.array(coord.ORIES, dtype=np.uint8)
+    perms, ories = _tables['decode']
+    p, o = np.divmod(states, moveTables()[0])
+    mask = np.ones(len(states), dtype=bool)
+    for index in indexes:
+        mask &= (perms[p, index] == index) & (ories[o, index] == 0)
+    return mask
+
+# Breadth-first search from start to the first layer with a state where isTarget is true
+# isTarget takes an array of states and returns a mask
+# Return (target state, route, states generated, states visited) or None, the target is the smallest one of its layer
+# budget (budget.Budget) is checked after every layer, a BudgetExceeded is returned when it is used up
+def search(start, isTarget, moves = None, reduced = False, budget = None):
+    names = moveTables(reduced)[3]
+    moves = moves or names
+    inverse = np.array([names.index(c.swapcase()) for c in moves], dtype=np.intp)
+    generated = visited = 0
+    for depth, layer, dist in bfs(start, moves, reduced):
+        visited += len(layer)
+        found = np.flatnonzero(isTarget(layer))
+        if len(found):
+            target = state = int(layer[found[0]])
+            # Walk back: the parent of a state at depth d is a state at depth d - 1 one inverse move away
+            route = ""
+            for d in range(depth - 1, -1, -1):
+                parents = expand(np.array([state], dtype=np.uint32), inverse, reduced)[:, 0]
+                i = np.flatnonzero(dist[parents] == d)[0]
+                route = moves[i] + route
+                state = int(parents[i])
+            return target, route, generated, visited
+        generated += len(layer) * len(moves)
+        if budget is not None:
+            reason = budget.exceeded(generated)
+            if reason is not None:
+                from budget import BudgetExceeded
+                return BudgetExceeded(reason, generated, visited, None, depth + 1)
+    return None